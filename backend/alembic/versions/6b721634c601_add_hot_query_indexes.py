@@ -0,0 +1,73 @@
+"""add hot-query indexes and restore unique mood_analysis.entry_id
+
+Revision ID: 6b721634c601
+Revises: 7f164ed23efd
+Create Date: 2026-10-19 10:02:17.554310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b721634c601'
+down_revision: Union[str, Sequence[str], None] = '7f164ed23efd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 035ff65049d8 dropped the unique constraint; keep only the newest
+    # analysis per entry before bringing it back.
+    op.execute(
+        """
+        DELETE FROM mood_analysis m
+        USING mood_analysis newer
+        WHERE m.entry_id = newer.entry_id
+          AND (m.created_at, m.id) < (newer.created_at, newer.id)
+        """
+    )
+
+    # build the indexes without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_journal_entries_user_id_created_at",
+            "journal_entries",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "uq_mood_analysis_entry_id",
+            "mood_analysis",
+            ["entry_id"],
+            unique=True,
+            postgresql_include=["id", "sentiment", "emotion", "score", "created_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_mood_analysis_user_id_created_at",
+            "mood_analysis",
+            ["user_id", "created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_mood_analysis_user_id_created_at",
+            table_name="mood_analysis",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "uq_mood_analysis_entry_id",
+            table_name="mood_analysis",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_journal_entries_user_id_created_at",
+            table_name="journal_entries",
+            postgresql_concurrently=True,
+        )
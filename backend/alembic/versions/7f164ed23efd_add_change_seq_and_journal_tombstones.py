@@ -0,0 +1,65 @@
+"""add change_seq to journal_entries and journal_tombstones table
+
+Revision ID: 7f164ed23efd
+Revises: 035ff65049d8
+Create Date: 2026-10-19 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f164ed23efd'
+down_revision: Union[str, Sequence[str], None] = '035ff65049d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE journal_change_seq")
+
+    op.add_column("journal_entries", sa.Column("change_seq", sa.BigInteger(), nullable=True))
+    op.execute("UPDATE journal_entries SET change_seq = nextval('journal_change_seq')")
+    op.alter_column(
+        "journal_entries",
+        "change_seq",
+        existing_type=sa.BigInteger(),
+        nullable=False,
+        server_default=sa.text("nextval('journal_change_seq')"),
+    )
+    op.create_index(
+        "ix_journal_entries_user_id_change_seq",
+        "journal_entries",
+        ["user_id", "change_seq"],
+    )
+
+    op.create_table(
+        "journal_tombstones",
+        sa.Column("entry_id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('journal_change_seq')"),
+            nullable=False,
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("entry_id"),
+    )
+    op.create_index(
+        "ix_journal_tombstones_user_id_change_seq",
+        "journal_tombstones",
+        ["user_id", "change_seq"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_journal_tombstones_user_id_change_seq", table_name="journal_tombstones")
+    op.drop_table("journal_tombstones")
+    op.drop_index("ix_journal_entries_user_id_change_seq", table_name="journal_entries")
+    op.drop_column("journal_entries", "change_seq")
+    op.execute("DROP SEQUENCE journal_change_seq")
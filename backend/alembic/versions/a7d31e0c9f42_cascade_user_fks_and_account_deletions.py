@@ -0,0 +1,66 @@
+"""cascade user foreign keys, add account_deletions
+
+Revision ID: a7d31e0c9f42
+Revises: f2c9e8a61b57
+Create Date: 2026-10-19 16:48:13.502977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d31e0c9f42'
+down_revision: Union[str, Sequence[str], None] = 'f2c9e8a61b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tables whose user_id references users.id
+CHILD_TABLES = ("journal_entries", "mood_analysis", "journal_tombstones", "journal_archive_segments")
+
+
+def _user_fk_names(table: str):
+    """Top-level FK constraint names (names differ between migrated and create_all databases)."""
+    rows = op.get_bind().execute(sa.text("""
+        SELECT conname FROM pg_constraint
+        WHERE contype = 'f' AND conrelid = CAST(:t AS regclass)
+          AND confrelid = CAST('users' AS regclass) AND conparentid = 0
+    """), {"t": table})
+    return [r.conname for r in rows]
+
+
+def _recreate_user_fks(ondelete) -> None:
+    for table in CHILD_TABLES:
+        for name in _user_fk_names(table):
+            op.drop_constraint(name, table, type_="foreignkey")
+        # on the partitioned tables this cascades to every partition
+        op.create_foreign_key(
+            f"{table}_user_id_fkey", table, "users", ["user_id"], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    _recreate_user_fks("CASCADE")
+
+    op.create_table(
+        "account_deletions",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("requested_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("moods_deleted", sa.BigInteger(), nullable=False),
+        sa.Column("entries_deleted", sa.BigInteger(), nullable=False),
+        sa.Column("tombstones_deleted", sa.BigInteger(), nullable=False),
+        sa.Column("segments_deleted", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("account_deletions")
+    _recreate_user_fks(None)
@@ -0,0 +1,30 @@
+"""add min_change_seq to journal_archive_segments
+
+Revision ID: b8e4f17a2c93
+Revises: a7d31e0c9f42
+Create Date: 2026-10-19 18:02:27.615340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f17a2c93'
+down_revision: Union[str, Sequence[str], None] = 'a7d31e0c9f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing segments stay NULL (always read) until they are rewritten
+    op.add_column(
+        "journal_archive_segments",
+        sa.Column("min_change_seq", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("journal_archive_segments", "min_change_seq")
@@ -0,0 +1,55 @@
+"""add inserted_at to journal_entries
+
+Revision ID: c1f9a3d7e254
+Revises: b8e4f17a2c93
+Create Date: 2026-10-19 19:36:11.208745
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f9a3d7e254'
+down_revision: Union[str, Sequence[str], None] = 'b8e4f17a2c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_journal_entries_inserted_at"
+
+
+def upgrade() -> None:
+    # nullable without a default first: no table rewrite; existing rows stay NULL
+    op.add_column("journal_entries", sa.Column("inserted_at", sa.DateTime(), nullable=True))
+    op.alter_column(
+        "journal_entries",
+        "inserted_at",
+        existing_type=sa.DateTime(),
+        server_default=sa.text("timezone('utc', now())"),
+    )
+
+    # CONCURRENTLY is not allowed on a partitioned parent: create the parent
+    # index invalid (ON ONLY), build each partition's concurrently, attach them
+    op.execute(f"CREATE INDEX {INDEX} ON ONLY journal_entries (inserted_at)")
+    partitions = [
+        r[0]
+        for r in op.get_bind().execute(sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST('journal_entries' AS regclass)"
+        ))
+    ]
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_inserted_at_idx "
+                f"ON {partition} (inserted_at)"
+            )
+            op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_inserted_at_idx")
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="journal_entries")
+    op.drop_column("journal_entries", "inserted_at")
@@ -0,0 +1,269 @@
+"""partition journal_entries and mood_analysis by month
+
+Revision ID: c3d8a1f5b920
+Revises: 6b721634c601
+Create Date: 2026-10-19 11:24:05.381027
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8a1f5b920'
+down_revision: Union[str, Sequence[str], None] = '6b721634c601'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# keep in step with PARTITION_MONTHS_AHEAD; the app tops this up at startup
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months_to_cover() -> list:
+    """
+    Every month that holds data, plus the current one and MONTHS_AHEAD.
+    Orphaned analyses (no entry) are partitioned by their own created_at.
+    """
+    bind = op.get_bind()
+    months = {
+        r[0].date()
+        for r in bind.execute(sa.text(
+            """
+            SELECT date_trunc('month', created_at) FROM journal_entries_unpartitioned
+            UNION
+            SELECT date_trunc('month', m.created_at)
+            FROM mood_analysis_unpartitioned m
+            LEFT JOIN journal_entries_unpartitioned e ON e.id = m.entry_id
+            WHERE e.id IS NULL
+            """
+        ))
+    }
+    now = datetime.utcnow()
+    current = date(now.year, now.month, 1)
+    months.update(_add_months(current, n) for n in range(MONTHS_AHEAD + 1))
+    return sorted(months)
+
+
+def _create_partitions(months) -> None:
+    for month in months:
+        for table in ("journal_entries", "mood_analysis"):
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} "
+                f"PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{_add_months(month, 1).isoformat()}')"
+            )
+
+
+def upgrade() -> None:
+    # move the plain tables aside; index names are schema-wide, so drop the
+    # old secondary indexes and rename the primary keys out of the way
+    op.drop_constraint("mood_analysis_entry_id_fkey", "mood_analysis", type_="foreignkey")
+    op.drop_index("uq_mood_analysis_entry_id", table_name="mood_analysis")
+    op.drop_index("ix_mood_analysis_user_id_created_at", table_name="mood_analysis")
+    op.drop_index("ix_journal_entries_user_id_created_at", table_name="journal_entries")
+    op.drop_index("ix_journal_entries_user_id_change_seq", table_name="journal_entries")
+    op.rename_table("journal_entries", "journal_entries_unpartitioned")
+    op.rename_table("mood_analysis", "mood_analysis_unpartitioned")
+    op.execute(
+        "ALTER TABLE journal_entries_unpartitioned "
+        "RENAME CONSTRAINT journal_entries_pkey TO journal_entries_unpartitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE mood_analysis_unpartitioned "
+        "RENAME CONSTRAINT mood_analysis_pkey TO mood_analysis_unpartitioned_pkey"
+    )
+
+    op.create_table(
+        "journal_entries",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('journal_change_seq')"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_table(
+        "mood_analysis",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("entry_id", sa.UUID(), nullable=True),
+        sa.Column("entry_created_at", sa.DateTime(), nullable=False),
+        sa.Column("sentiment", sa.String(), nullable=False),
+        sa.Column("emotion", sa.String(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["entry_id", "entry_created_at"],
+            ["journal_entries.id", "journal_entries.created_at"],
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id", "entry_created_at"),
+        postgresql_partition_by="RANGE (entry_created_at)",
+    )
+    _create_partitions(_months_to_cover())
+
+    op.execute(
+        """
+        INSERT INTO journal_entries (id, user_id, content, created_at, updated_at, change_seq)
+        SELECT id, user_id, content, created_at, updated_at, change_seq
+        FROM journal_entries_unpartitioned
+        """
+    )
+    # orphaned analyses (entry_id NULL) fall back to their own timestamp
+    op.execute(
+        """
+        INSERT INTO mood_analysis
+            (id, user_id, entry_id, entry_created_at, sentiment, emotion, score, created_at)
+        SELECT m.id, m.user_id, e.id, coalesce(e.created_at, m.created_at),
+               m.sentiment, m.emotion, m.score, m.created_at
+        FROM mood_analysis_unpartitioned m
+        LEFT JOIN journal_entries_unpartitioned e ON e.id = m.entry_id
+        """
+    )
+    op.drop_table("mood_analysis_unpartitioned")
+    op.drop_table("journal_entries_unpartitioned")
+
+    # indexes on the parents cascade to every existing and future partition
+    op.create_index(
+        "ix_journal_entries_user_id_change_seq",
+        "journal_entries",
+        ["user_id", "change_seq"],
+    )
+    op.create_index(
+        "ix_journal_entries_user_id_created_at",
+        "journal_entries",
+        ["user_id", sa.text("created_at DESC")],
+    )
+    op.create_index(
+        "uq_mood_analysis_entry_id",
+        "mood_analysis",
+        ["entry_id", "entry_created_at"],
+        unique=True,
+        postgresql_include=["id", "sentiment", "emotion", "score", "created_at"],
+    )
+    op.create_index(
+        "ix_mood_analysis_user_id_created_at",
+        "mood_analysis",
+        ["user_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.create_table(
+        "journal_entries_unpartitioned",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('journal_change_seq')"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="journal_entries_user_id_fkey_unpartitioned"
+        ),
+        sa.PrimaryKeyConstraint("id", name="journal_entries_unpartitioned_pkey"),
+    )
+    op.create_table(
+        "mood_analysis_unpartitioned",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("entry_id", sa.UUID(), nullable=True),
+        sa.Column("sentiment", sa.String(), nullable=False),
+        sa.Column("emotion", sa.String(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="mood_analysis_user_id_fkey_unpartitioned"
+        ),
+        sa.PrimaryKeyConstraint("id", name="mood_analysis_unpartitioned_pkey"),
+    )
+    op.execute(
+        """
+        INSERT INTO journal_entries_unpartitioned
+            (id, user_id, content, created_at, updated_at, change_seq)
+        SELECT id, user_id, content, created_at, updated_at, change_seq
+        FROM journal_entries
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO mood_analysis_unpartitioned
+            (id, user_id, entry_id, sentiment, emotion, score, created_at)
+        SELECT id, user_id, entry_id, sentiment, emotion, score, created_at
+        FROM mood_analysis
+        """
+    )
+    # dropping the parents drops every partition with them
+    op.drop_table("mood_analysis")
+    op.drop_table("journal_entries")
+
+    op.rename_table("journal_entries_unpartitioned", "journal_entries")
+    op.rename_table("mood_analysis_unpartitioned", "mood_analysis")
+    op.execute(
+        "ALTER TABLE journal_entries "
+        "RENAME CONSTRAINT journal_entries_unpartitioned_pkey TO journal_entries_pkey"
+    )
+    op.execute(
+        "ALTER TABLE journal_entries "
+        "RENAME CONSTRAINT journal_entries_user_id_fkey_unpartitioned TO journal_entries_user_id_fkey"
+    )
+    op.execute(
+        "ALTER TABLE mood_analysis "
+        "RENAME CONSTRAINT mood_analysis_unpartitioned_pkey TO mood_analysis_pkey"
+    )
+    op.execute(
+        "ALTER TABLE mood_analysis "
+        "RENAME CONSTRAINT mood_analysis_user_id_fkey_unpartitioned TO mood_analysis_user_id_fkey"
+    )
+    op.create_foreign_key(
+        "mood_analysis_entry_id_fkey",
+        "mood_analysis",
+        "journal_entries",
+        ["entry_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_journal_entries_user_id_change_seq",
+        "journal_entries",
+        ["user_id", "change_seq"],
+    )
+    op.create_index(
+        "ix_journal_entries_user_id_created_at",
+        "journal_entries",
+        ["user_id", sa.text("created_at DESC")],
+    )
+    op.create_index(
+        "uq_mood_analysis_entry_id",
+        "mood_analysis",
+        ["entry_id"],
+        unique=True,
+        postgresql_include=["id", "sentiment", "emotion", "score", "created_at"],
+    )
+    op.create_index(
+        "ix_mood_analysis_user_id_created_at",
+        "mood_analysis",
+        ["user_id", "created_at"],
+    )
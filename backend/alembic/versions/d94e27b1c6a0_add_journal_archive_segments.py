@@ -0,0 +1,41 @@
+"""add journal_archive_segments manifest table
+
+Revision ID: d94e27b1c6a0
+Revises: c3d8a1f5b920
+Create Date: 2026-10-19 12:41:52.904163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94e27b1c6a0'
+down_revision: Union[str, Sequence[str], None] = 'c3d8a1f5b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "journal_archive_segments",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("min_created_at", sa.DateTime(), nullable=False),
+        sa.Column("max_created_at", sa.DateTime(), nullable=False),
+        sa.Column("max_change_seq", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "month", name="uq_journal_archive_segments_user_id_month"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("journal_archive_segments")
@@ -1,15 +1,29 @@
 # backend/app/auth/auth.py
+import time
 from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID, uuid4
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import models
 from app.db.database import get_db
+from app.auth.principal import AccessClaims, Principal, cached_token, principals_cache, remember_token
+from app.auth.revocation import revocations
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pin the cost: hashes made with any other cost count as outdated,
+# so login rehashes them (app/auth/passwords.py does the hashing off-loop)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
 # Hashing
@@ -19,35 +33,125 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-# JWT token creation
+# JWT tokens
+# Access tokens are short-lived and checked without touching the database
+# (signature + in-memory revocation list). Refresh tokens are long-lived,
+# single-use and backed by a refresh_tokens row; /users/refresh rotates them.
 def create_access_token(data: dict, expires_delta: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=expires_delta)
-    to_encode.update({"exp": expire})
+    now = time.time()
+    to_encode.update({
+        "exp": int(now + expires_delta * 60),
+        "iat": now,
+        "jti": str(uuid4()),
+        "type": "access",
+    })
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-# ✅ This is the missing function
-from uuid import UUID
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
-    credentials_exception = HTTPException(
+def create_refresh_token(user_id: UUID, jti: UUID, family_id: UUID, expires_at: datetime) -> str:
+    return jwt.encode(
+        {
+            "sub": str(user_id),
+            "jti": str(jti),
+            "fam": str(family_id),
+            "type": "refresh",
+            "exp": expires_at,
+        },
+        settings.SECRET_KEY,
+        algorithm="HS256",
+    )
+
+
+def issue_tokens(db: AsyncSession, user_id: UUID, family_id: Optional[UUID] = None) -> dict:
+    """
+    New access + refresh token pair. Adds the refresh_tokens row to `db`;
+    the caller commits. A new login starts a new family.
+    """
+    refresh = models.RefreshToken(
+        id=uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid4(),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(refresh)
+    return {
+        "access_token": create_access_token({"sub": str(user_id)}),
+        "refresh_token": create_refresh_token(user_id, refresh.id, refresh.family_id, refresh.expires_at),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def decode_refresh_token(token: str) -> UUID:
+    """jti of a validly signed, unexpired refresh token; 401 otherwise."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        if payload.get("type") != "refresh":
+            raise _credentials_exception()
+        return UUID(payload["jti"])
+    except (JWTError, KeyError, ValueError):
+        raise _credentials_exception()
+
+
+def decode_access_token(token: str) -> AccessClaims:
+    """Verified claims of an access token (cached per token); 401 otherwise."""
+    claims = cached_token(token)
+    if claims is not None:
+        return claims
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        # tokens issued before refresh tokens existed carry no type / jti / iat
+        if payload.get("type", "access") != "access":
+            raise _credentials_exception()
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-        user_uuid = UUID(user_id)  # Convert string to UUID object
+            raise _credentials_exception()
+        jti = payload.get("jti")
+        claims = AccessClaims(
+            user_id=UUID(user_id),  # Convert string to UUID object
+            jti=UUID(jti) if jti else None,
+            iat=float(payload.get("iat", 0)),
+            exp=float(payload.get("exp", float("inf"))),
+        )
     except (JWTError, ValueError):
-        raise credentials_exception
+        raise _credentials_exception()
+    remember_token(token, claims)
+    return claims
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    Resolve the bearer token to a Principal. The signature check, the
+    revocation check and the users lookup are all served from memory when
+    possible, so a warm request does no crypto and no query.
+    """
+    claims = decode_access_token(token)
+    if revocations.is_revoked(claims.jti, claims.user_id, claims.iat):
+        raise _credentials_exception()
 
-    user = db.query(models.User).filter(models.User.id == user_uuid).first()
-    if user is None:
-        raise credentials_exception
+    user_uuid = claims.user_id
+    principal = principals_cache.get((user_uuid,))
+    if principal is None:
+        # taken before the query: an invalidation that lands meanwhile keeps this row out
+        generation = principals_cache.generation()
+        row = (await db.execute(
+            select(
+                models.User.id, models.User.username, models.User.email, models.User.is_verified
+            ).where(models.User.id == user_uuid)
+        )).first()
+        if row is None:
+            raise _credentials_exception()
+        principal = Principal(row.id, row.username, row.email, bool(row.is_verified))
+        principals_cache.set((user_uuid,), principal, generation)
 
-    return user
+    return principal
@@ -0,0 +1,52 @@
+# backend/app/auth/passwords.py
+"""
+Password hashing and verification on a dedicated, bounded thread pool.
+
+bcrypt is deliberately slow (~0.2 s at cost 12) and releases the GIL while
+it runs, so a small thread pool is enough to keep it off both the event
+loop and the shared request threadpool; a login burst then queues here
+instead of starving every other `run_in_threadpool` call. Waiting callers
+are bounded by a ConcurrencyGate, and a full queue is answered with 429.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from app.auth.auth import pwd_context
+from app.core import metrics
+from app.core.config import settings
+from app.core.ratelimit import ConcurrencyGate
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+password_gate = ConcurrencyGate(
+    "password_hash",
+    limit=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def _run(op: str, fn, *args):
+    async with password_gate.slot(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS):
+        t0 = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+        metrics.observe("password_hash_seconds", time.perf_counter() - t0, op=op)
+    return result
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", pwd_context.hash, password)
+
+
+async def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check `password` against the stored hash. If it matches but was made with
+    another cost factor, also return a fresh hash for the caller to store.
+    """
+    ok, new_hash = await _run("verify", pwd_context.verify_and_update, password, hashed_password)
+    if new_hash is not None:
+        metrics.inc("password_rehash_total")
+    return ok, new_hash
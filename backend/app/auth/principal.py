@@ -0,0 +1,75 @@
+# backend/app/auth/principal.py
+"""
+The authenticated caller, and the per-worker caches that let most requests
+authenticate without touching the users table.
+
+`tokens_cache` maps a raw bearer token to its decoded AccessClaims, so the
+JWT signature is checked once per token rather than once per request.
+`principals_cache` maps a user id to a small immutable Principal. Both are
+per worker process; the TTL bounds how long another worker can keep serving
+a principal after the account changed. In this worker, call
+`invalidate_principal` after any change to a user row.
+"""
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """What routes need to know about the caller; not an ORM object, never lazy-loads."""
+    id: uuid.UUID
+    username: str
+    email: str
+    is_verified: bool
+
+
+@dataclass(frozen=True, slots=True)
+class AccessClaims:
+    """The parts of a verified access token that authentication needs (times are unix)."""
+    user_id: uuid.UUID
+    jti: Optional[uuid.UUID]  # None for tokens issued before jti was added
+    iat: float
+    exp: float
+
+
+# (token,) -> AccessClaims
+tokens_cache = TTLCache(
+    name="auth_tokens",
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AUTH_CACHE_MAX_BYTES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    sizeof=lambda value: 128,
+    enabled=settings.AUTH_CACHE_ENABLED,
+)
+
+# (user_id,) -> Principal
+principals_cache = TTLCache(
+    name="auth_principals",
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AUTH_CACHE_MAX_BYTES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    sizeof=lambda p: 128 + len(p.username) + len(p.email),
+    enabled=settings.AUTH_CACHE_ENABLED,
+)
+
+
+def cached_token(token: str) -> Optional[AccessClaims]:
+    """Claims of an already-verified token, or None if unknown or expired."""
+    claims: Optional[AccessClaims] = tokens_cache.get((token,))
+    if claims is None or claims.exp <= time.time():
+        return None
+    return claims
+
+
+def remember_token(token: str, claims: AccessClaims) -> None:
+    tokens_cache.set((token,), claims)
+
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    """Forget the cached principal after the user row changed or was deleted."""
+    principals_cache.invalidate(user_id)
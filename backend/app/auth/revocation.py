@@ -0,0 +1,139 @@
+# backend/app/auth/revocation.py
+"""
+Access-token revocation without a per-request query.
+
+Revocations are rows in token_revocations: a single access token (by jti),
+or every access token a user was issued up to a point in time. Access tokens
+are short-lived, so a row only matters until the tokens it covers expire and
+the live set stays small. Each worker keeps it in memory as a jti set plus a
+user -> revoked-before map, reloaded every TOKEN_REVOCATION_REFRESH_SECONDS.
+The request path is a set probe and a dict lookup.
+
+A revocation made by this worker applies here immediately; other workers
+pick it up on their next refresh.
+"""
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import RefreshToken, TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+
+def _ts(dt: datetime) -> float:
+    """Naive UTC datetime (as stored) -> unix time."""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    def __init__(self):
+        self._jtis: Set[uuid.UUID] = set()
+        self._users: Dict[uuid.UUID, float] = {}  # user_id -> revoked up to (unix time)
+        # revocations made here, kept until they expire so a reload that
+        # raced with them cannot drop them: (jti, user_id, before, expires)
+        self._local: list = []
+
+    def is_revoked(self, jti: Optional[uuid.UUID], user_id: uuid.UUID, iat: float) -> bool:
+        if jti is not None and jti in self._jtis:
+            return True
+        before = self._users.get(user_id)
+        return before is not None and iat <= before
+
+    def add(self, jti: Optional[uuid.UUID], user_id: uuid.UUID, before: float, expires: float) -> None:
+        self._local.append((jti, user_id, before, expires))
+        self._apply(self._jtis, self._users, jti, user_id, before)
+        self._publish()
+
+    def replace(self, rows: Iterable) -> None:
+        """Swap in a fresh snapshot of (jti, user_id, revoked_at, expires_at) rows."""
+        jtis: Set[uuid.UUID] = set()
+        users: Dict[uuid.UUID, float] = {}
+        for row in rows:
+            self._apply(jtis, users, row.jti, row.user_id, _ts(row.revoked_at))
+        now = time.time()
+        self._local = [item for item in self._local if item[3] > now]
+        for jti, user_id, before, _ in self._local:
+            self._apply(jtis, users, jti, user_id, before)
+        self._jtis, self._users = jtis, users
+        self._publish()
+
+    @staticmethod
+    def _apply(jtis, users, jti, user_id, before) -> None:
+        if jti is not None:
+            jtis.add(jti)
+        else:
+            users[user_id] = max(before, users.get(user_id, 0.0))
+
+    def _publish(self) -> None:
+        metrics.set_gauge("token_revocations_active", len(self._jtis), kind="token")
+        metrics.set_gauge("token_revocations_active", len(self._users), kind="user")
+
+
+revocations = RevocationList()
+
+
+async def refresh_revocations() -> None:
+    """Reload the live revocations from the primary."""
+    t0 = time.perf_counter()
+    async with SessionLocal() as db:
+        rows = (await db.execute(
+            select(
+                TokenRevocation.jti,
+                TokenRevocation.user_id,
+                TokenRevocation.revoked_at,
+            ).where(TokenRevocation.expires_at > datetime.utcnow())
+        )).all()
+    revocations.replace(rows)
+    metrics.observe("token_revocations_refresh_seconds", time.perf_counter() - t0)
+
+
+async def revoke_access_token(db: AsyncSession, user_id: uuid.UUID, jti: uuid.UUID, exp: float) -> None:
+    """Revoke one access token until it would have expired anyway. Commits."""
+    now = datetime.utcnow()
+    expires_at = datetime.utcfromtimestamp(exp)
+    db.add(TokenRevocation(jti=jti, user_id=user_id, revoked_at=now, expires_at=expires_at))
+    await db.commit()
+    revocations.add(jti, user_id, _ts(now), exp)
+    metrics.inc("token_revocations_total", kind="token")
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """
+    Revoke every access token issued to the user so far and all their
+    refresh tokens (logout everywhere, password change, account deletion).
+    Commits.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    db.add(TokenRevocation(jti=None, user_id=user_id, revoked_at=now, expires_at=expires_at))
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    await db.commit()
+    revocations.add(None, user_id, _ts(now), _ts(expires_at))
+    metrics.inc("token_revocations_total", kind="user")
+
+
+async def purge_expired_tokens() -> None:
+    """Delete revocations and refresh tokens that can no longer matter."""
+    now = datetime.utcnow()
+    async with SessionLocal() as db:
+        revoked = await db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now))
+        refresh = await db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        await db.commit()
+    if revoked.rowcount or refresh.rowcount:
+        logger.info(
+            "Purged %d expired token revocations and %d refresh tokens",
+            revoked.rowcount, refresh.rowcount,
+        )
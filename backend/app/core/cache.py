@@ -0,0 +1,150 @@
+# app/core/cache.py
+"""
+Small in-process LRU cache with TTL and a memory budget.
+
+Keys are tuples whose first element is the "owner" (e.g. a user id), so all
+entries of one owner can be dropped at once with `invalidate(owner)`.
+A reader that builds a value from the database takes `generation()` before
+its query and passes it to `set()`; if the owner was invalidated in between,
+the value is dropped instead of caching a pre-write snapshot.
+The cache is per worker process; the TTL bounds how stale another worker's
+copy can get after a write.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core import metrics
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        sizeof: Callable[[Any], int],
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._sizeof = sizeof
+        # key -> (expires_at, size, value)
+        self._data: "OrderedDict[Tuple[Hashable, ...], tuple]" = OrderedDict()
+        self._bytes = 0
+        # bumped by every invalidate(); owner -> (clock, monotonic time) of its last one
+        self._clock = 0
+        self._invalidated: Dict[Hashable, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    # ---- lookups ----
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                metrics.inc("cache_misses_total", cache=self.name)
+                return None
+            expires_at, size, value = item
+            if expires_at <= now:
+                self._pop(key)
+                metrics.inc("cache_misses_total", cache=self.name)
+                return None
+            self._data.move_to_end(key)
+        metrics.inc("cache_hits_total", cache=self.name)
+        return value
+
+    def generation(self) -> Tuple[int, float]:
+        """Token for set(); take it before reading what the value is built from."""
+        with self._lock:
+            return self._clock, time.monotonic()
+
+    def set(
+        self,
+        key: Tuple[Hashable, ...],
+        value: Any,
+        generation: Optional[Tuple[int, float]] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            # never let a single huge response flush the whole cache
+            return
+        with self._lock:
+            if generation is not None:
+                clock, taken_at = generation
+                if time.monotonic() - taken_at >= self.ttl_seconds:
+                    # as old as the TTL already (and older than what purge keeps)
+                    return
+                invalidated = self._invalidated.get(key[0])
+                if invalidated is not None and invalidated[0] > clock:
+                    # a write landed while the value was being built
+                    return
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+                metrics.inc("cache_evictions_total", cache=self.name)
+            self._publish()
+
+    # ---- invalidation ----
+    def invalidate(self, owner: Hashable) -> None:
+        """Drop every key whose first element is `owner`."""
+        with self._lock:
+            self._clock += 1
+            self._invalidated[owner] = (self._clock, time.monotonic())
+            stale = [k for k in self._data if k[0] == owner]
+            for k in stale:
+                self._pop(k)
+            self._publish()
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, (expires_at, _, _) in self._data.items() if expires_at <= now]
+            for k in stale:
+                self._pop(k)
+            # set() rejects generations older than the TTL, so these can go
+            horizon = now - self.ttl_seconds
+            for owner in [o for o, (_, at) in self._invalidated.items() if at <= horizon]:
+                del self._invalidated[owner]
+            self._publish()
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._publish()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    # ---- internals (caller holds the lock) ----
+    def _pop(self, key) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _publish(self) -> None:
+        metrics.set_gauge("cache_entries", len(self._data), cache=self.name)
+        metrics.set_gauge("cache_bytes", self._bytes, cache=self.name)
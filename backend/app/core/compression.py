@@ -0,0 +1,158 @@
+# app/core/compression.py
+"""
+Negotiated gzip / brotli compression for selected routes.
+
+Pure ASGI middleware, so streaming responses (the export) are compressed
+chunk by chunk and flushed as they go instead of being buffered. Buffered
+responses below `minimum_size` are sent as-is; compressing them costs more
+CPU than it saves on the wire. Responses that already carry a
+Content-Encoding, or are compressed files themselves, are left alone.
+"""
+from __future__ import annotations
+
+import time
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+# already-compressed payloads gain nothing from a second pass
+SKIP_CONTENT_TYPES = ("application/gzip", "application/zip", "image/", "video/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q-values."""
+    best, best_q = None, 0.0
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == "br" and brotli is None:
+            continue
+        if name not in ("br", "gzip") or q <= 0:
+            continue
+        # on a tie prefer brotli: smaller output for text at similar CPU
+        if q > best_q or (q == best_q and name == "br"):
+            best, best_q = name, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality, mode=brotli.MODE_TEXT)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Iterable[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressingSend(send, encoding, self)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: Optional[str], mw: CompressionMiddleware):
+        self.send = send
+        self.encoding = encoding
+        self.mw = mw
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            out_headers = MutableHeaders(raw=start["headers"])
+            content_type = out_headers.get("content-type", "")
+            if "content-encoding" in out_headers or content_type.startswith(SKIP_CONTENT_TYPES):
+                self.passthrough = True
+                await self.send(start)
+            elif self.encoding is None or (not more_body and len(body) < self.mw.minimum_size):
+                # the body could have been compressed for another client
+                out_headers.add_vary_header("Accept-Encoding")
+                self.passthrough = True
+                await self.send(start)
+            else:
+                self.compressor = _Compressor(
+                    self.encoding, self.mw.gzip_level, self.mw.brotli_quality
+                )
+                out_headers["Content-Encoding"] = self.encoding
+                out_headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    # streamed: length unknown up front
+                    del out_headers["Content-Length"]
+                    await self.send(start)
+                else:
+                    body = self._compress(body, final=True)
+                    out_headers["Content-Length"] = str(len(body))
+                    await self.send(start)
+                    await self.send({"type": "http.response.body", "body": body})
+                    return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        await self.send({
+            "type": "http.response.body",
+            "body": self._compress(body, final=not more_body),
+            "more_body": more_body,
+        })
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        t0 = time.perf_counter()
+        out = self.compressor.compress(data, final)
+        metrics.observe("compression_seconds", time.perf_counter() - t0, encoding=self.encoding)
+        metrics.inc("compression_bytes_in_total", len(data), encoding=self.encoding)
+        metrics.inc("compression_bytes_out_total", len(out), encoding=self.encoding)
+        return out
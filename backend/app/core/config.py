@@ -1,27 +1,50 @@
 # app/core/config.py
-from pydantic_settings import BaseSettings
-from fastapi_mail import ConnectionConfig
-import os
+from datetime import datetime
 
 from pydantic_settings import BaseSettings
 
-import logging
-
-logging.basicConfig(
-    level=logging.DEBUG,  # 👈 show debug messages
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-)
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "AI-Powered Personal Journal"
 
+    # --- Logging (app/core/log.py) ---
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # or "text"
+    LOG_LEVELS: str = ""  # per-logger overrides, e.g. "sqlalchemy.engine=WARNING,app.services.nlp=DEBUG"
+    LOG_SAMPLE_RATES: str = ""  # share of sub-WARNING records kept, e.g. "uvicorn.access=0.05"
+    LOG_RATE_LIMIT_PER_MINUTE: int = 60  # identical sub-WARNING messages per logger per minute; 0 = off
+    LOG_REDACT_CONTENT: bool = True  # never write journal text into logs
+
+    # --- Metrics (app/core/metrics.py, served at /metrics) ---
+    PROMETHEUS_MULTIPROC_DIR: str = ""  # required with several workers; empty it before each start
+    METRICS_HTTP_ENABLED: bool = True  # per-route latency/status and per-request DB stats
+
     # Database
     DATABASE_URL: str
+    # pool is per worker process: total connections ~= workers * (size + overflow)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; keep below server/proxy idle timeouts
+    DB_POOL_PRE_PING: bool = False  # opt back in for flaky networks
+    # Optional read replicas, comma-separated URLs; empty = read from primary
+    REPLICA_DATABASE_URLS: str = ""
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = 10
+    READ_YOUR_WRITES_SECONDS: int = 5  # same-worker pin; clients returning X-Write-LSN are pinned by WAL position
 
     # Auth / JWT
     SECRET_KEY: str
     ALGORITHM: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # stateless; keep short, clients use /users/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5  # how fast other workers see a logout
+    TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # --- Password hashing (dedicated pool, per worker) ---
+    BCRYPT_ROUNDS: int = 12  # changing it rehashes each password at its next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5
 
     # Email (Mailtrap / SMTP)
     MAIL_USERNAME: str
@@ -32,11 +55,26 @@ class Settings(BaseSettings):
     MAIL_SERVER: str
     MAIL_TLS: bool = True
     MAIL_SSL: bool = False
+    MAIL_USE_CREDENTIALS: bool = True  # False for a local sink, e.g. python -m aiosmtpd -n
+
+    # --- Email outbox (app/services/email_outbox.py) ---
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5  # other workers' enqueues are seen within this
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50  # rows claimed per round
+    EMAIL_SMTP_POOL_SIZE: int = 2  # open SMTP connections per worker
+    EMAIL_SMTP_IDLE_SECONDS: float = 60  # close pooled connections idle longer than this
+    EMAIL_SMTP_TIMEOUT_SECONDS: float = 30
+    EMAIL_SEND_LEASE_SECONDS: int = 300  # a claimed row is retried after this if its sender died
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: float = 30  # doubled per attempt
+    EMAIL_RETRY_MAX_SECONDS: float = 3600
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7  # sent/failed rows are purged after this
 
     # Hugging Face Inference API
     HF_API_TOKEN: str = None
     HF_SENTIMENT_MODEL: str = "distilbert-base-uncased-finetuned-sst-2-english"
     HF_EMOTION_MODEL: str = "j-hartmann/emotion-english-distilroberta-base"
+    NLP_HTTP_POOL_SIZE: int = 10  # keep-alive connections per host, shared by inference threads
+    NLP_WARMUP_MODELS: bool = False  # send one tiny inference per model at startup (load cold models)
 
      # --- DeepL / Translation settings ---
     # Put your DeepL API key in .env as TRANSLATE_API_KEY
@@ -45,22 +83,94 @@ class Settings(BaseSettings):
     TRANSLATE_API_URL: str = "https://api-free.deepl.com/v2/translate"
     TRANSLATE_TIMEOUT: int = 30  # seconds
 
+    # --- Journal read cache (per worker, in-process) ---
+    JOURNAL_CACHE_ENABLED: bool = True
+    JOURNAL_CACHE_MAX_ENTRIES: int = 1024
+    JOURNAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    JOURNAL_CACHE_TTL_SECONDS: int = 30
+
+    # --- Authenticated-user cache (per worker): decoded tokens and principals ---
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_MAX_ENTRIES: int = 100_000
+    AUTH_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60  # how long other workers may see a changed account
+
+    # --- Admission control (per worker) for routes that run mood analysis ---
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CREATE_PER_MINUTE: float = 20  # sustained POST /journals/ per user
+    RATE_LIMIT_UPDATE_PER_MINUTE: float = 20  # sustained PUT /journals/{id} per user
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_IMPORT_CHUNKS_PER_MINUTE: float = 10  # sustained IMPORT_CHUNK_SIZE-row chunks per user
+    RATE_LIMIT_IMPORT_BURST: int = 100  # chunks; enough for one IMPORT_MAX_ITEMS import
+    RATE_LIMIT_MAX_TRACKED_USERS: int = 100_000
+    INFERENCE_MAX_CONCURRENCY: int = 8  # analyses in flight at once
+    INFERENCE_MAX_QUEUE: int = 32  # requests allowed to wait for a slot
+    INFERENCE_QUEUE_TIMEOUT_SECONDS: float = 10
+
+    # --- List previews ---
+    JOURNAL_PREVIEW_CHARS: int = 200  # default prefix length for GET /journals/?preview=true
+
+    # --- Bulk import / batched analysis ---
+    IMPORT_CHUNK_SIZE: int = 500  # rows per multi-row INSERT + commit
+    IMPORT_MAX_ITEMS: int = 50000  # per request
+    IMPORT_MIN_CREATED_AT: datetime = datetime(1970, 1, 1)  # older created_at values are rejected
+    IMPORT_MAX_CLOCK_SKEW_SECONDS: int = 300  # how far in the future created_at may be
+    BATCH_MAX_ITEMS: int = 500  # ids per POST /journals/batch (deletes + updates)
+    ANALYSIS_BATCH_SIZE: int = 32  # texts per DeepL/HF call
+
+    # --- Export ---
+    EXPORT_BATCH_SIZE: int = 500  # rows fetched per server-side cursor round-trip
+
+    # --- Delta sync ---
+    SYNC_PAGE_SIZE: int = 500
+    TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_COMPACTION_INTERVAL_SECONDS: int = 3600
+
+    # --- Housekeeping ---
+    MAINTENANCE_BATCH_SIZE: int = 1000  # rows per statement/commit in cleanup jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LOCK_KEY: int = 7_364_021_905  # pg advisory lock id held by the leader worker
+    SCHEDULER_LEADER_CHECK_SECONDS: float = 15
+    CACHE_PURGE_INTERVAL_SECONDS: int = 60  # per worker
+    UNVERIFIED_USER_GRACE_HOURS: int = 24  # after the OTP expired
+    UNVERIFIED_USER_PURGE_INTERVAL_SECONDS: int = 3600
+    ORPHAN_MOOD_PURGE_INTERVAL_SECONDS: int = 24 * 3600
+    PENDING_ANALYSIS_INTERVAL_SECONDS: int = 600
+    PENDING_ANALYSIS_MIN_AGE_MINUTES: int = 10
+    PENDING_ANALYSIS_LOOKBACK_DAYS: int = 30
+    PENDING_ANALYSIS_PER_RUN: int = 500
+    EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS: int = 24 * 3600
+    ACCOUNT_DELETION_RESUME_INTERVAL_SECONDS: int = 300
+    ACCOUNT_DELETION_STALE_SECONDS: int = 300  # untouched this long = runner died, resume it
+    ACCOUNT_DELETION_PAUSE_SECONDS: float = 0  # sleep between batches of one account
+
+    # --- Partitioning (journal_entries / mood_analysis, monthly) ---
+    PARTITION_MONTHS_AHEAD: int = 3  # partitions created in advance
+    # kept ready for back-dated imports (older rows are rejected); every partition adds planning
+    # cost to queries not bounded by created_at (by id, /changes, export), so keep this small
+    PARTITION_MONTHS_BACK: int = 12
+    PARTITION_DETACH_AFTER_MONTHS: int = 0  # detach older months; 0 = keep everything
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 6 * 3600
+
+    # --- Response compression (negotiated br / gzip) ---
+    COMPRESSION_ENABLED: bool = True
+    # exact paths: the list, changes and export routes carry full entry text
+    COMPRESSION_PATHS: str = "/journals/,/journals/changes,/journals/export"
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller buffered bodies go out as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; above ~5 CPU grows much faster than savings
+
+    # --- Cold archive (Parquet segments per user and month) ---
+    ARCHIVE_ENABLED: bool = False  # enable once ARCHIVE_DIR is storage shared by all workers
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_COMPRESSION: str = "zstd"
+    ARCHIVE_SEGMENTS_PER_RUN: int = 200
+    ARCHIVE_INTERVAL_SECONDS: int = 24 * 3600
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # optional, will skip unknown vars instead of failing
 
 settings = Settings()
 
-
-# FastAPI-Mail config
-mail_conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-)
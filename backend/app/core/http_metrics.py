@@ -0,0 +1,85 @@
+# app/core/http_metrics.py
+"""
+Per-route HTTP metrics and per-request database statistics.
+
+Pure ASGI middleware, like the compression one. It records, per request:
+
+- http_requests_total{method, route, status}
+- http_request_duration_seconds{method, route}, up to the last body byte
+  (background tasks that run after the response are not counted)
+- db_queries_per_request{route} and db_time_per_request_seconds{route}
+
+`route` is the route template (`/journals/{entry_id}`), never the raw path,
+so the number of series stays bounded; unmatched paths share one label.
+The query counts come from the cursor hooks in app/db/pool.py, which add to
+the RequestStats of the current request through a context variable.
+"""
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# set for the duration of one HTTP request; None in background work
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+UNMATCHED = "<unmatched>"
+
+
+class HTTPMetricsMiddleware:
+    def __init__(self, app: ASGIApp, exclude: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            recorded = True
+            route = getattr(scope.get("route"), "path", UNMATCHED)
+            method = scope["method"]
+            metrics.inc("http_requests_total", method=method, route=route, status=status)
+            metrics.observe(
+                "http_request_duration_seconds", time.perf_counter() - start, method=method, route=route
+            )
+            metrics.observe("db_queries_per_request", stats.queries, route=route)
+            metrics.observe("db_time_per_request_seconds", stats.db_seconds, route=route)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                if not recorded:
+                    record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            if not recorded:
+                # failed before (or while) sending the response, or the client went away
+                record()
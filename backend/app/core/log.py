@@ -0,0 +1,184 @@
+# app/core/log.py
+"""
+Process-wide logging setup, done once by app/main.py.
+
+Importing settings (scripts, Alembic, workers) never touches logging; the
+app entry point installs a single stderr handler that writes one JSON object
+per record (LOG_FORMAT=json) or classic text lines. Everything is driven by
+Settings:
+
+- LOG_LEVEL for the root logger, LOG_LEVELS for per-logger overrides,
+  e.g. "sqlalchemy.engine=WARNING,app.services.nlp=DEBUG"
+- LOG_SAMPLE_RATES keeps only a fraction of a noisy logger's records below
+  WARNING, e.g. "uvicorn.access=0.05"; kept records carry `sample_rate`
+- LOG_RATE_LIMIT_PER_MINUTE caps identical messages (same logger and
+  format string) below WARNING per minute; the next one let through reports
+  how many were dropped in `suppressed`. Warnings and errors always pass, and
+  so does uvicorn.access, whose lines all share one format string (thin it
+  with LOG_SAMPLE_RATES instead)
+- LOG_REDACT_CONTENT makes `Redacted(text)` arguments log the length of
+  journal text instead of the text itself
+
+Filters sit on the handler, so they see records from every logger, and
+run only for records that passed the level check. Callers pass arguments
+%-style (`logger.info("x=%s", x)`) so nothing is formatted for records that
+end up dropped.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# attributes every LogRecord has; anything else came in through `extra=`
+# (uvicorn's color_message duplicates msg with ANSI codes)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "color_message"}
+
+
+def _parse_mapping(spec: str) -> Dict[str, str]:
+    """Parse "a=1, b.c=2" into {"a": "1", "b.c": "2"}."""
+    out = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            out[name.strip()] = value.strip()
+    return out
+
+
+def _lookup(table: Dict[str, float], name: str) -> Optional[float]:
+    """Value for `name` or its nearest configured parent logger."""
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+class Redacted:
+    """
+    Journal text as a log argument, rendered only if the record is emitted:
+    its length when LOG_REDACT_CONTENT is on, else the first `keep` chars.
+    """
+
+    __slots__ = ("text", "keep")
+
+    def __init__(self, text: Optional[str], keep: int = 80):
+        self.text = text
+        self.keep = keep
+
+    def __str__(self) -> str:
+        if self.text is None:
+            return "<none>"
+        if settings.LOG_REDACT_CONTENT:
+            return f"<{len(self.text)} chars>"
+        return self.text[:self.keep]
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        item = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                item[key] = value
+        if record.exc_info:
+            item["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            item["stack"] = record.stack_info
+        return orjson.dumps(item, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keep `rate` of a logger's records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self._rates = rates
+        self._cache: Dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._cache.get(record.name)
+        if rate is None:
+            rate = _lookup(self._rates, record.name)
+            rate = self._cache[record.name] = 1.0 if rate is None else rate
+        if rate >= 1.0:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    At most `per_minute` records per (logger, format string) in each
+    one-minute window, for records below WARNING: per-call debug/info chatter
+    stays readable under load. Warnings, errors and the access log pass.
+    """
+
+    MAX_KEYS = 10_000
+    EXEMPT_LOGGERS = frozenset({"uvicorn.access"})
+
+    def __init__(self, per_minute: int):
+        super().__init__()
+        self.per_minute = per_minute
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window_start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name in self.EXEMPT_LOGGERS:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 60:
+                if len(self._windows) >= self.MAX_KEYS:
+                    self._windows.clear()
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.per_minute:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def configure_logging() -> None:
+    handler = logging.StreamHandler()
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    rates = {name: float(rate) for name, rate in _parse_mapping(settings.LOG_SAMPLE_RATES).items()}
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+    if settings.LOG_RATE_LIMIT_PER_MINUTE > 0:
+        handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_PER_MINUTE))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in _parse_mapping(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level.upper())
+    # uvicorn installs its own text handlers before importing the app;
+    # route its records (access log included) through ours instead
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
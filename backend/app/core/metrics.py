@@ -0,0 +1,140 @@
+# app/core/metrics.py
+"""
+Process metrics, exported in the Prometheus text format at /metrics.
+
+The API stays tiny: `inc`, `set_gauge` and `observe`, keyed by name and
+labels. Each name becomes a prometheus_client collector on first use, with
+the label names of that call. Observations named `*_seconds` (and the names
+in HISTOGRAM_BUCKETS) become histograms; other observations, such as sizes,
+are summaries (count + sum).
+
+Several uvicorn workers: set PROMETHEUS_MULTIPROC_DIR (environment or
+.env) to a directory that is emptied before the server starts. Every worker
+then writes its samples to mmapped files there, and /metrics, whichever
+worker serves it, reports the sum over all of them. Gauges are summed over
+live workers unless GAUGE_MODES says otherwise. Without it, each worker
+reports only itself.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Tuple
+
+from app.core.config import settings
+
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    # prometheus_client picks its value storage when it is imported
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    Summary,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120,
+)
+HISTOGRAM_BUCKETS: Dict[str, Tuple[float, ...]] = {
+    "db_queries_per_request": (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+}
+# gauges every worker reports the same value for: adding them up is wrong
+GAUGE_MODES = {
+    "job_last_success_timestamp": "max",
+    "token_revocations_active": "max",
+    "db_replica_healthy": "min",
+}
+
+_lock = threading.Lock()
+_collectors: Dict[str, object] = {}
+_children: Dict[tuple, object] = {}
+
+
+def _child(kind: str, name: str, labels: dict):
+    key = (name, tuple(sorted(labels.items())))
+    child = _children.get(key)
+    if child is not None:
+        return child
+    with _lock:
+        collector = _collectors.get(name)
+        if collector is None:
+            labelnames = sorted(labels)
+            doc = name.replace("_", " ")
+            if kind == "counter":
+                collector = Counter(name, doc, labelnames)
+            elif kind == "gauge":
+                collector = Gauge(name, doc, labelnames, multiprocess_mode=GAUGE_MODES.get(name, "livesum"))
+            elif name.endswith("_seconds") or name in HISTOGRAM_BUCKETS:
+                collector = Histogram(name, doc, labelnames, buckets=HISTOGRAM_BUCKETS.get(name, LATENCY_BUCKETS))
+            else:
+                collector = Summary(name, doc, labelnames)
+            _collectors[name] = collector
+        child = collector.labels(**labels) if labels else collector
+        _children[key] = child
+    return child
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    """Increment a counter."""
+    _child("counter", name, labels).inc(amount)
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to an absolute value."""
+    _child("gauge", name, labels).set(value)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one observation (e.g. a duration in seconds)."""
+    _child("observation", name, labels).observe(value)
+
+
+# ----------------- EXPORT -----------------
+def _registry():
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render() -> Tuple[bytes, str]:
+    """Body and content type for a Prometheus scrape."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def snapshot() -> dict:
+    """The same data as a JSON-friendly dict (counters, gauges, summaries as count + sum)."""
+    out = {"counters": {}, "gauges": {}, "summaries": {}}
+    for family in _registry().collect():
+        if family.name.startswith(("python_", "process_")):
+            continue
+        for sample in family.samples:
+            labels = {k: v for k, v in sample.labels.items() if k not in ("le", "quantile")}
+            if family.type == "counter" and sample.name.endswith("_total"):
+                out["counters"].setdefault(sample.name, []).append({"labels": labels, "value": sample.value})
+            elif family.type == "gauge":
+                out["gauges"].setdefault(sample.name, []).append({"labels": labels, "value": sample.value})
+            elif family.type in ("histogram", "summary") and sample.name.endswith(("_count", "_sum")):
+                series = out["summaries"].setdefault(family.name, [])
+                item = next((s for s in series if s["labels"] == labels), None)
+                if item is None:
+                    item = {"labels": labels, "count": 0, "sum": 0.0}
+                    series.append(item)
+                item["count" if sample.name.endswith("_count") else "sum"] = sample.value
+    return out
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared files (call at shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,141 @@
+# app/core/ratelimit.py
+"""
+In-process admission control: per-key token buckets and a concurrency gate.
+
+Both are per worker process, like the caches: with N workers the effective
+global limits are N times the configured ones. Rejections raise RateLimited,
+which main.py turns into a 429 with a Retry-After header.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable, Optional
+
+from app.core import metrics
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class TokenBucketLimiter:
+    """
+    One bucket per key (e.g. a user id) holding up to `burst` tokens and
+    refilled at `rate_per_minute`. Buckets are kept in LRU order and capped at
+    `max_keys`; an evicted bucket simply starts full again.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, max_keys: int = 100_000):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable, cost: float = 1.0) -> None:
+        """Take `cost` tokens from `key`'s bucket or raise RateLimited."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            metrics.inc("ratelimit_rejections_total", limiter=self.name)
+            raise RateLimited((cost - tokens) / self.rate, f"{self.name} rate limit")
+        metrics.inc("ratelimit_allowed_total", limiter=self.name)
+
+
+class ConcurrencyGate:
+    """
+    At most `limit` holders at a time; up to `max_queue` more may wait.
+    Callers with a timeout are rejected when the queue is full or the wait
+    runs out; callers without one (background work) always wait their turn.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._sem = asyncio.Semaphore(limit)
+        self._waiting = 0
+        self._in_flight = 0
+        self._avg_hold = 1.0  # seconds, EWMA of slot hold time for Retry-After
+
+    def _retry_after(self) -> float:
+        return self._avg_hold * (self._waiting + 1) / self.limit
+
+    def _publish(self) -> None:
+        metrics.set_gauge("gate_in_flight", self._in_flight, gate=self.name)
+        metrics.set_gauge("gate_queued", self._waiting, gate=self.name)
+
+    def _release_if_acquired(self, task: "asyncio.Future") -> None:
+        if not task.cancelled() and task.exception() is None:
+            self._sem.release()
+
+    def _abandon(self, task: "asyncio.Future") -> None:
+        # the acquire may complete in the same loop turn as the cancel; if it
+        # did, hand the permit back instead of leaking it
+        task.cancel()
+        task.add_done_callback(self._release_if_acquired)
+
+    async def _acquire(self, timeout: Optional[float]) -> None:
+        """
+        Semaphore acquire with a timeout that can't leak a permit. On Python
+        3.10, wait_for(sem.acquire(), t) may time out just as the acquire
+        wins, and that permit is never released.
+        """
+        task = asyncio.ensure_future(self._sem.acquire())
+        try:
+            await asyncio.wait({task}, timeout=timeout)
+        except BaseException:
+            # the caller was cancelled while waiting
+            self._abandon(task)
+            raise
+        if not task.done():
+            self._abandon(task)
+            raise asyncio.TimeoutError()
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        if timeout is not None and self._sem.locked() and self._waiting >= self.max_queue:
+            metrics.inc("gate_rejections_total", gate=self.name, reason="queue_full")
+            raise RateLimited(self._retry_after(), f"{self.name} queue full")
+
+        self._waiting += 1
+        self._publish()
+        t0 = time.monotonic()
+        try:
+            await self._acquire(timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("gate_rejections_total", gate=self.name, reason="timeout")
+            raise RateLimited(self._retry_after(), f"{self.name} busy")
+        finally:
+            self._waiting -= 1
+            self._publish()
+            metrics.observe("gate_queue_wait_seconds", time.monotonic() - t0, gate=self.name)
+
+        self._in_flight += 1
+        metrics.set_gauge("gate_in_flight", self._in_flight, gate=self.name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - started)
+            self._in_flight -= 1
+            self._sem.release()
+            self._publish()
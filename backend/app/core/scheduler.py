@@ -0,0 +1,146 @@
+# app/core/scheduler.py
+"""
+In-process periodic job scheduler with leader election.
+
+Every worker process runs the same Scheduler. Jobs marked `leader_only`
+(database housekeeping) only run in the worker that holds a session-level
+Postgres advisory lock, taken with pg_try_advisory_lock on a dedicated
+connection outside the request pool. If that worker dies or loses its
+connection, Postgres releases the lock and another worker takes over at its
+next check. Local jobs (cache purges, per-worker refreshes) run everywhere.
+
+Leadership is re-checked right before each leader job, so after a failover
+two workers overlap for at most one run; jobs must be idempotent and work
+in small committed batches anyway.
+
+Jobs return the number of rows they touched (or None); runs, durations
+and rows are exported as job_* metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    interval_seconds: float
+    fn: Callable[[], Awaitable[Optional[int]]]
+    leader_only: bool = True
+    run_at_start: bool = False  # first run right after start instead of one interval later
+
+
+class Scheduler:
+    def __init__(self, url, lock_key: int, jobs: List[Job], leader_check_seconds: float = 15):
+        self.jobs = jobs
+        self.lock_key = lock_key
+        self.leader_check_seconds = leader_check_seconds
+        self.is_leader = False
+        self._url = url
+        self._engine = None
+        self._conn: Optional[AsyncConnection] = None
+        self._conn_lock = asyncio.Lock()  # one statement at a time on the lock connection
+        self._tasks: List[asyncio.Task] = []
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._leader_loop()))
+        for job in self.jobs:
+            self._tasks.append(asyncio.create_task(self._job_loop(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        async with self._conn_lock:
+            if self._conn is not None:
+                try:
+                    await self._conn.execute(
+                        text("SELECT pg_advisory_unlock(:k)"), {"k": self.lock_key}
+                    )
+                except Exception:
+                    pass  # closing the session releases it anyway
+            await self._drop_connection()
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    # ---- leadership ----
+    async def check_leadership(self) -> bool:
+        """Confirm the lock is still held, or try to take it; returns is_leader."""
+        async with self._conn_lock:
+            try:
+                if self._conn is None:
+                    if self._engine is None:
+                        # outside the request pool: the session must outlive any checkout
+                        self._engine = create_async_engine(self._url, poolclass=NullPool)
+                    conn = await self._engine.connect()
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    got = await conn.scalar(
+                        text("SELECT pg_try_advisory_lock(:k)"), {"k": self.lock_key}
+                    )
+                    if got:
+                        self._conn = conn
+                    else:
+                        await conn.close()
+                else:
+                    await self._conn.execute(text("SELECT 1"))
+            except Exception:
+                logger.warning("Scheduler lock connection failed; giving up leadership", exc_info=True)
+                await self._drop_connection()
+            leader = self._conn is not None
+        if leader != self.is_leader:
+            logger.info("Scheduler leadership %s", "acquired" if leader else "lost")
+        self.is_leader = leader
+        metrics.set_gauge("scheduler_leader", int(leader))
+        return leader
+
+    async def _drop_connection(self) -> None:
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception:
+                await self._conn.invalidate()
+        self._conn = None
+
+    async def _leader_loop(self) -> None:
+        while True:
+            await self.check_leadership()
+            await asyncio.sleep(self.leader_check_seconds)
+
+    # ---- jobs ----
+    async def _job_loop(self, job: Job) -> None:
+        delay = 0 if job.run_at_start else job.interval_seconds
+        while True:
+            await asyncio.sleep(delay)
+            delay = job.interval_seconds
+            if job.leader_only and not await self.check_leadership():
+                continue
+            await self.run_job(job)
+
+    async def run_job(self, job: Job) -> Optional[int]:
+        t0 = time.perf_counter()
+        try:
+            rows = await job.fn()
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+            metrics.inc("job_runs_total", job=job.name, status="error")
+            return None
+        finally:
+            metrics.observe("job_duration_seconds", time.perf_counter() - t0, job=job.name)
+        metrics.inc("job_runs_total", job=job.name, status="ok")
+        metrics.inc("job_rows_total", rows or 0, job=job.name)
+        metrics.set_gauge("job_last_success_timestamp", time.time(), job=job.name)
+        return rows
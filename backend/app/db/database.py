@@ -1,25 +1,51 @@
 # backend/app/db/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, instrument_pool
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# No sqlite-specific connect_args for Postgres
-connect_args = {}
-engine = create_engine(
+def _async_url(url: str):
+    """Point a plain postgres URL at the asyncpg driver (Alembic keeps the sync one)."""
+    u = make_url(url)
+    if u.drivername in ("postgres", "postgresql", "postgresql+psycopg2", "postgresql+psycopg"):
+        u = u.set(drivername="postgresql+asyncpg")
+    # asyncpg calls it `ssl`, libpq calls it `sslmode`
+    query = dict(u.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+        u = u.set(query=query)
+    return u
+
+
+SQLALCHEMY_DATABASE_URL = _async_url(settings.DATABASE_URL)
+
+# No pre-ping by default: instead of a round-trip on every checkout,
+# connections are recycled before the server/proxy idle timeout, LIFO
+# checkout lets surplus connections age out, and a dead connection found
+# mid-request invalidates the pool so the next checkout reconnects.
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,   # helps avoid "server closed the connection" errors
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     # echo=True,         # uncomment for SQL query debugging in development
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_pool(engine.sync_engine)
+
+# expire_on_commit=False: committed objects stay readable without a
+# refresh SELECT per instance (and without implicit IO, which async forbids)
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,11 +1,18 @@
 # models.py
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Text, Boolean
+from sqlalchemy import (
+    BigInteger, Column, Date, String, DateTime, ForeignKey, ForeignKeyConstraint, Float, Integer,
+    Text, Boolean, Index, Sequence, UniqueConstraint, text,
+)
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 from .database import Base
 
+# Shared, monotonically increasing version for journal changes (inserts,
+# updates and deletions). Clients sync with "everything after seq N".
+journal_change_seq = Sequence("journal_change_seq", metadata=Base.metadata)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -16,9 +23,15 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    # relationships
-    entries = relationship("JournalEntry", back_populates="user", cascade="all, delete-orphan")
-    moods = relationship("MoodAnalysis", back_populates="user", cascade="all, delete-orphan")
+    # relationships; passive_deletes: children go through the database's
+    # ON DELETE CASCADE instead of being loaded and deleted one by one
+    # (large accounts are deleted in batches first, see app/services/account_deletion.py)
+    entries = relationship(
+        "JournalEntry", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+    moods = relationship(
+        "MoodAnalysis", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     # new fields
     is_verified = Column(Boolean, default=False)
@@ -27,13 +40,33 @@ class User(Base):
 
 
 class JournalEntry(Base):
+    """Range-partitioned by created_at month (see app/services/partitions.py)."""
     __tablename__ = "journal_entries"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # part of the primary key because it is the partition key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
+    change_seq = Column(
+        BigInteger,
+        journal_change_seq,
+        server_default=journal_change_seq.next_value(),
+        nullable=False,
+    )
+    # when the row was written; created_at can be back-dated by imports.
+    # NULL on rows older than the column
+    inserted_at = Column(DateTime, nullable=True, server_default=text("timezone('utc', now())"))
+
+    __table_args__ = (
+        Index("ix_journal_entries_user_id_change_seq", "user_id", "change_seq"),
+        # list / export: WHERE user_id = ? ORDER BY created_at
+        Index("ix_journal_entries_user_id_created_at", "user_id", created_at.desc()),
+        # pending-analysis sweep: WHERE inserted_at in the lookback window
+        Index("ix_journal_entries_inserted_at", "inserted_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     # relationships
     user = relationship("User", back_populates="entries")
@@ -47,20 +80,177 @@ class JournalEntry(Base):
 
 
 class MoodAnalysis(Base):
+    """
+    Range-partitioned by the *entry's* created_at month, so an analysis lives
+    in the partition matching its entry and the (entry_id, entry_created_at)
+    foreign key/unique key can include the partition key.
+    """
     __tablename__ = "mood_analysis"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    entry_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("journal_entries.id", ondelete="CASCADE"),
-        nullable=True
-    )
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entry_id = Column(UUID(as_uuid=True), nullable=True)
+    entry_created_at = Column(DateTime, primary_key=True)
     sentiment = Column(String, nullable=False)
     emotion = Column(String, nullable=False)
     score = Column(Float, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["entry_id", "entry_created_at"],
+            ["journal_entries.id", "journal_entries.created_at"],
+            ondelete="CASCADE",
+        ),
+        # one analysis per entry; INCLUDE makes the per-entry lookup index-only
+        Index(
+            "uq_mood_analysis_entry_id",
+            "entry_id",
+            "entry_created_at",
+            unique=True,
+            postgresql_include=["id", "sentiment", "emotion", "score", "created_at"],
+        ),
+        Index("ix_mood_analysis_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (entry_created_at)"},
+    )
+
     # relationships
     user = relationship("User", back_populates="moods")
     entry = relationship("JournalEntry", back_populates="mood_analysis")
+
+
+class JournalTombstone(Base):
+    """Trace of a deleted journal entry, kept so clients can sync deletions."""
+    __tablename__ = "journal_tombstones"
+
+    entry_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    change_seq = Column(
+        BigInteger,
+        journal_change_seq,
+        server_default=journal_change_seq.next_value(),
+        nullable=False,
+    )
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_journal_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+
+class JournalArchiveSegment(Base):
+    """
+    Manifest of one archived (user, month): a compressed Parquet file holding
+    entries moved out of journal_entries/mood_analysis (see app/services/archive.py).
+    """
+    __tablename__ = "journal_archive_segments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)
+    path = Column(String, nullable=False)  # relative to ARCHIVE_DIR
+    row_count = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    min_created_at = Column(DateTime, nullable=False)
+    max_created_at = Column(DateTime, nullable=False)
+    min_change_seq = Column(BigInteger, nullable=True)  # NULL on segments older than the column
+    max_change_seq = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", name="uq_journal_archive_segments_user_id_month"),
+    )
+
+
+class RefreshToken(Base):
+    """
+    One issued refresh token (its jti is the id). Tokens are rotated on use;
+    all tokens descending from one login share a family_id, so presenting an
+    already-used token revokes the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
+
+class TokenRevocation(Base):
+    """
+    A revoked access token (jti set), or every access token of a user issued
+    up to revoked_at (jti NULL). A row only matters until the tokens it covers
+    expire; workers load the live rows into memory (app/auth/revocation.py).
+    No FK to users: revocations must outlive a deleted account.
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    jti = Column(UUID(as_uuid=True), nullable=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_token_revocations_expires_at", "expires_at"),
+    )
+
+
+class EmailOutbox(Base):
+    """
+    Outgoing email, written in the same transaction as whatever triggered it
+    and delivered by the outbox worker (app/services/email_outbox.py).
+    status: pending -> sent | failed.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    subtype = Column(String, nullable=False, default="plain")  # plain | html
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # the worker's claim query only ever looks at pending rows
+        Index(
+            "ix_email_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+
+class AccountDeletion(Base):
+    """
+    Progress of one account deletion (app/services/account_deletion.py).
+    No FK: the row outlives the user it describes.
+    status: pending -> running -> done.
+    """
+    __tablename__ = "account_deletions"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    requested_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    moods_deleted = Column(BigInteger, nullable=False, default=0)
+    entries_deleted = Column(BigInteger, nullable=False, default=0)
+    tombstones_deleted = Column(BigInteger, nullable=False, default=0)
+    segments_deleted = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
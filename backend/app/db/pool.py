@@ -0,0 +1,96 @@
+# backend/app/db/pool.py
+"""
+Connection-pool and query instrumentation.
+
+`InstrumentedQueuePool` times how long a checkout waits for a free
+connection; the event hooks track connections in use, overflow and
+invalidations. Everything is reported through app.core.metrics so the pool
+can be sized against the number of workers.
+
+The cursor hooks time every statement (db_query_duration_seconds by pool
+and statement verb, db_query_errors_total) and add it to the current
+request's RequestStats, if any, for the per-request DB metrics.
+"""
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import metrics
+from app.core.http_metrics import request_stats
+
+_VERBS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))
+
+
+def _verb(statement: str) -> str:
+    words = statement.lstrip()[:7].split(None, 1)
+    verb = words[0].upper() if words else ""
+    return verb if verb in _VERBS else "OTHER"
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # set by instrument_pool(); labels the metrics of this pool
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.inc("db_pool_checkout_timeouts_total", pool=self.metrics_name)
+            raise
+        finally:
+            metrics.observe(
+                "db_pool_checkout_wait_seconds", time.perf_counter() - start, pool=self.metrics_name
+            )
+
+
+def _publish(pool, name: str) -> None:
+    metrics.set_gauge("db_pool_in_use", pool.checkedout(), pool=name)
+    metrics.set_gauge("db_pool_overflow", max(pool.overflow(), 0), pool=name)
+    metrics.set_gauge("db_pool_idle", pool.checkedin(), pool=name)
+
+
+def instrument_pool(sync_engine, name: str = "primary") -> None:
+    """Attach pool and query metric hooks to `sync_engine` (AsyncEngine.sync_engine)."""
+    pool = sync_engine.pool
+    pool.metrics_name = name
+    metrics.set_gauge("db_pool_size", pool.size(), pool=name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        _publish(pool, name)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        _publish(pool, name)
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        metrics.inc("db_pool_connects_total", pool=name)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        metrics.inc("db_pool_invalidations_total", pool=name, soft="false")
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_conn, record, exception):
+        metrics.inc("db_pool_invalidations_total", pool=name, soft="true")
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        metrics.observe("db_query_duration_seconds", elapsed, pool=name, op=_verb(statement))
+        # runs in SQLAlchemy's greenlet, which carries the request's context
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        metrics.inc("db_query_errors_total", pool=name)
@@ -0,0 +1,185 @@
+# backend/app/db/replicas.py
+"""
+Read-replica routing.
+
+Read-only dependencies ask `read_sessionmaker(user_id, min_lsn)` for a
+session factory: healthy replicas are used round-robin, the primary is used
+when there are none, when all are down, or when the user's last write may
+not have been replayed yet (so they always see their own writes).
+
+Read-your-writes works across workers because the client carries the pin:
+write routes call `pin_client()`, which sends the primary's WAL position
+after the commit as a signed token (WRITE_LSN_HEADER response header and a
+cookie of the same name). Reads that present it only go to a replica whose
+last seen `pg_last_wal_replay_lsn()` has reached it. Clients that don't send
+it back still get the older per-worker pin of READ_YOUR_WRITES_SECONDS.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.auth import get_current_user
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal, _async_url
+from app.db.pool import InstrumentedQueuePool, instrument_pool
+
+logger = logging.getLogger(__name__)
+
+
+class _Replica:
+    def __init__(self, index: int, url: str):
+        self.name = f"replica{index}"
+        self.engine = create_async_engine(
+            _async_url(url),
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_use_lifo=True,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        instrument_pool(self.engine.sync_engine, name=self.name)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = True
+        self.replay_lsn = 0  # as of the last health check; only ever behind the real one
+
+
+_replicas: List[_Replica] = [
+    _Replica(i, url.strip())
+    for i, url in enumerate(settings.REPLICA_DATABASE_URLS.split(","))
+    if url.strip()
+]
+_round_robin = itertools.count()
+_recent_writes: Dict[object, float] = {}  # user_id -> monotonic deadline
+
+WRITE_LSN_HEADER = "X-Write-LSN"
+
+
+def _parse_lsn(value: str) -> int:
+    """'16/B374D848' -> integer WAL position."""
+    hi, lo = value.split("/")
+    return (int(hi, 16) << 32) | int(lo, 16)
+
+
+def _sign(user_id, lsn: int) -> str:
+    msg = f"{user_id}:{lsn}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()[:32]
+
+
+def _client_lsn(request: Request, user_id) -> Optional[int]:
+    """The WAL position of the caller's last write, if it sent a valid token."""
+    token = request.headers.get(WRITE_LSN_HEADER) or request.cookies.get(WRITE_LSN_HEADER)
+    if not token:
+        return None
+    lsn, _, signature = token.partition(".")
+    if not lsn.isdigit() or not hmac.compare_digest(signature, _sign(user_id, int(lsn))):
+        return None
+    return int(lsn)
+
+
+async def pin_client(response: Response, db: AsyncSession, user_id) -> None:
+    """
+    After a committed write: hand the client a token for the primary's WAL
+    position, so its next reads on any worker wait for a replica that has it.
+    """
+    if not _replicas:
+        return
+    lsn = _parse_lsn(await db.scalar(text("SELECT pg_current_wal_lsn()::text")))
+    token = f"{lsn}.{_sign(user_id, lsn)}"
+    response.headers[WRITE_LSN_HEADER] = token
+    response.set_cookie(WRITE_LSN_HEADER, token, httponly=True, samesite="lax")
+
+
+def mark_write(user_id) -> None:
+    """Pin `user_id`'s reads in this worker to the primary for READ_YOUR_WRITES_SECONDS."""
+    if _replicas:
+        _recent_writes[user_id] = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+
+def read_sessionmaker(user_id=None, min_lsn: Optional[int] = None) -> async_sessionmaker:
+    if not _replicas:
+        return SessionLocal
+    if user_id is not None:
+        deadline = _recent_writes.get(user_id)
+        if deadline is not None:
+            if deadline > time.monotonic():
+                metrics.inc("db_read_routing_total", target="primary", reason="recent_write")
+                return SessionLocal
+            _recent_writes.pop(user_id, None)
+
+    healthy = [r for r in _replicas if r.healthy]
+    if not healthy:
+        metrics.inc("db_read_routing_total", target="primary", reason="no_healthy_replica")
+        return SessionLocal
+    if min_lsn is not None:
+        healthy = [r for r in healthy if r.replay_lsn >= min_lsn]
+        if not healthy:
+            metrics.inc("db_read_routing_total", target="primary", reason="replica_behind_write")
+            return SessionLocal
+    replica = healthy[next(_round_robin) % len(healthy)]
+    metrics.inc("db_read_routing_total", target=replica.name, reason="round_robin")
+    return replica.sessionmaker
+
+
+async def _ping(replica: _Replica) -> bool:
+    try:
+        async with replica.engine.connect() as conn:
+            lsn = await asyncio.wait_for(
+                conn.scalar(text("SELECT pg_last_wal_replay_lsn()::text")), timeout=2
+            )
+        if lsn is not None:
+            replica.replay_lsn = _parse_lsn(lsn)
+        return True
+    except Exception as exc:
+        logger.warning("Replica %s failed health check: %s", replica.name, exc)
+        return False
+
+
+async def check_health() -> None:
+    """Refresh replica health flags and drop expired read-your-writes pins."""
+    for replica, ok in zip(_replicas, await asyncio.gather(*(_ping(r) for r in _replicas))):
+        if ok != replica.healthy:
+            logger.info("Replica %s is now %s", replica.name, "healthy" if ok else "unhealthy")
+        replica.healthy = ok
+        metrics.set_gauge("db_replica_healthy", int(ok), replica=replica.name)
+
+    now = time.monotonic()
+    for user_id in [u for u, deadline in _recent_writes.items() if deadline <= now]:
+        _recent_writes.pop(user_id, None)
+
+
+def has_replicas() -> bool:
+    return bool(_replicas)
+
+
+async def dispose() -> None:
+    for replica in _replicas:
+        await replica.engine.dispose()
+
+
+def client_lsn(request: Request, current_user=Depends(get_current_user)) -> Optional[int]:
+    """Dependency: the caller's read-your-writes position (see module docstring)."""
+    return _client_lsn(request, current_user.id) if _replicas else None
+
+
+async def get_read_db(
+    current_user=Depends(get_current_user),
+    min_lsn: Optional[int] = Depends(client_lsn),
+):
+    """Session dependency for read-only routes (see module docstring)."""
+    async with read_sessionmaker(current_user.id, min_lsn)() as db:
+        yield db
@@ -1,13 +1,114 @@
 # backend/app/main.py
-from fastapi import FastAPI
-from app.db import models
-from app.db.database import engine
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from app.db.database import SQLALCHEMY_DATABASE_URL, engine
+from app.db import replicas
+from app.auth import revocation
+from app.core import metrics
+from app.core.scheduler import Job, Scheduler
+from app.core.compression import CompressionMiddleware
+from app.core.http_metrics import HTTPMetricsMiddleware
+from app.core.ratelimit import RateLimited
+from app.core.config import settings
+from app.core.log import configure_logging
 from app.routers import users, journal   # 👈 add journal router
+from app.services import account_deletion, archive, email_outbox, maintenance, nlp, partitions, sync
+
+configure_logging()
+
+
+def _jobs():
+    jobs = [
+        # every worker: in-process state
+        Job("purge_caches", settings.CACHE_PURGE_INTERVAL_SECONDS,
+            maintenance.purge_caches, leader_only=False),
+        Job("refresh_revocations", settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+            revocation.refresh_revocations, leader_only=False),
+        # one worker (the advisory-lock holder): database housekeeping
+        Job("maintain_partitions", settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+            partitions.maintain_partitions, run_at_start=True),
+        Job("compact_tombstones", settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS,
+            sync.compact_tombstones),
+        Job("purge_expired_tokens", settings.TOKEN_PURGE_INTERVAL_SECONDS,
+            revocation.purge_expired_tokens),
+        Job("purge_email_outbox", settings.EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS,
+            email_outbox.purge_old),
+        Job("purge_unverified_users", settings.UNVERIFIED_USER_PURGE_INTERVAL_SECONDS,
+            maintenance.purge_unverified_users),
+        Job("delete_orphan_moods", settings.ORPHAN_MOOD_PURGE_INTERVAL_SECONDS,
+            maintenance.delete_orphan_moods),
+        Job("analyze_pending_entries", settings.PENDING_ANALYSIS_INTERVAL_SECONDS,
+            maintenance.analyze_pending_entries),
+        Job("resume_account_deletions", settings.ACCOUNT_DELETION_RESUME_INTERVAL_SECONDS,
+            account_deletion.resume_account_deletions),
+    ]
+    if settings.ARCHIVE_ENABLED:
+        jobs.append(Job("archive_cold_entries", settings.ARCHIVE_INTERVAL_SECONDS,
+                        archive.archive_cold_entries))
+    if replicas.has_replicas():
+        jobs.append(Job("replica_health", settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+                        replicas.check_health, leader_only=False))
+    return jobs
+
+
+scheduler = Scheduler(
+    SQLALCHEMY_DATABASE_URL,
+    lock_key=settings.SCHEDULER_LOCK_KEY,
+    jobs=_jobs(),
+    leader_check_seconds=settings.SCHEDULER_LEADER_CHECK_SECONDS,
+)
+
 
-app = FastAPI(title="AI Journal API 🚀")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # No DDL here: the schema belongs to Alembic (`python -m scripts.init_db`
+    # once per deploy, before the workers start) and partitions to the scheduler
+    # leader, so starting N workers never races on locks.
+    await revocation.refresh_revocations()
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+    worker_tasks = [
+        asyncio.create_task(email_outbox.run_worker()),
+        # warm the inference clients without delaying readiness
+        asyncio.create_task(run_in_threadpool(nlp.warm_up)),
+    ]
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    for task in worker_tasks:
+        task.cancel()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.stop()
+    await email_outbox.smtp_pool.close_idle()
+    await engine.dispose()
+    await replicas.dispose()
+    metrics.mark_process_dead()
+
+
+app = FastAPI(title="AI Journal API 🚀", lifespan=lifespan)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        paths=[p.strip() for p in settings.COMPRESSION_PATHS.split(",") if p.strip()],
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+if settings.METRICS_HTTP_ENABLED:
+    # added last, so outermost: timings include compression
+    app.add_middleware(HTTPMetricsMiddleware)
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Too many requests ({exc.reason}), retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # Include routers
 app.include_router(users.router)
@@ -16,3 +117,12 @@ app.include_router(journal.router)   # 👈 include here
 @app.get("/")
 def root():
     return {"message": "AI Journal API is running 🚀"}
+
+
+@app.get("/metrics")
+def get_metrics(format: str = "prometheus"):
+    """Prometheus text format; ?format=json for the old JSON snapshot."""
+    if format == "json":
+        return metrics.snapshot()
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
@@ -1,198 +1,901 @@
 # backend/app/routers/journal.py
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy import Text, any_, bindparam, column, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
 from app.db import models
 from app.db.database import get_db
+from app.db import replicas
+from app.db.replicas import get_read_db
+from app.services.journal_cache import after_write, entries_cache
 from app.auth.auth import get_current_user
+from app.auth.principal import Principal
 from app.services import nlp  # HF API client wrapper
+from app.services.analysis import analyze_entries
+from app.services.admission import (
+    charge, create_limiter, import_limiter, inference_gate, rate_limit, update_limiter,
+)
+from app.services import archive, partitions, sync
+from app.core.config import settings
+from app.core.ratelimit import RateLimited
+from app.schemas.journal_schemas import (
+    JournalBatch,
+    JournalBatchOut,
+    JournalChangesOut,
+    JournalCreate,
+    JournalImportOut,
+    JournalListOut,
+    JournalOut,
+    JournalPreviewListOut,
+    JournalUpdate,
+    JournalWriteOut,
+    MessageOut,
+)
+import csv
+import io
+import json
+import logging
+import orjson
 import uuid
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Literal, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/journals", tags=["journals"])
 
 
-class JournalEntryCreate(BaseModel):
+class JournalImportItem(BaseModel):
     content: str
+    created_at: Optional[datetime] = None  # original timestamp from the source app
 
-
-class JournalEntryUpdate(BaseModel):
-    content: str
+    @field_validator("created_at")
+    @classmethod
+    def _created_at_in_range(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # stored as naive UTC; far-future values would sort above every real entry
+        value = _naive_utc(value)
+        if value is None:
+            return value
+        if value < settings.IMPORT_MIN_CREATED_AT:
+            raise ValueError(f"created_at before {settings.IMPORT_MIN_CREATED_AT:%Y-%m-%d}")
+        if value > datetime.utcnow() + timedelta(seconds=settings.IMPORT_MAX_CLOCK_SKEW_SECONDS):
+            raise ValueError("created_at is in the future")
+        return value
 
 
 # ----------------- CREATE -----------------
-@router.post("/", status_code=201)
-def create_journal_entry(
-    entry: JournalEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    # create entry
-    new_entry = models.JournalEntry(user_id=current_user.id, content=entry.content)
-    db.add(new_entry)
-    db.commit()
-    db.refresh(new_entry)
-
-    # analyze mood via HF API
+def _analyze_safely(content: str) -> dict:
     try:
-        analysis = nlp.analyze_mood(new_entry.content)
+        return nlp.analyze_mood(content)
     except Exception:
-        analysis = {"sentiment": "unknown", "emotion": "unknown", "score": 0.0}
+        return {"sentiment": "unknown", "emotion": "unknown", "score": 0.0}
+
+
+async def _analyze_admitted(content: str) -> dict:
+    """Run inference in the threadpool once the worker-wide gate admits it (429 otherwise)."""
+    async with inference_gate.slot(timeout=settings.INFERENCE_QUEUE_TIMEOUT_SECONDS):
+        return await run_in_threadpool(_analyze_safely, content)
+
 
-    # persist mood analysis linked to this entry
+@router.post(
+    "/",
+    status_code=201,
+    response_model=JournalWriteOut,
+    dependencies=[Depends(rate_limit(create_limiter))],
+)
+async def create_journal_entry(
+    entry: JournalCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # analyze mood via HF API before touching the DB, so no transaction
+    # (or pooled connection) is held open during inference
+    analysis = await _analyze_admitted(entry.content)
+
+    # entry + mood analysis in one transaction; ids and timestamps are
+    # generated client-side and change_seq comes back via INSERT ... RETURNING
+    new_entry = models.JournalEntry(
+        id=uuid.uuid4(),
+        user_id=current_user.id,
+        content=entry.content,
+        created_at=datetime.utcnow(),
+    )
     new_mood = models.MoodAnalysis(
+        id=uuid.uuid4(),
         user_id=current_user.id,
-        entry_id=new_entry.id,
         sentiment=analysis.get("sentiment", "unknown"),
         emotion=analysis.get("emotion", "unknown"),
         score=analysis.get("score", 0.0),
+        created_at=new_entry.created_at,
     )
-    db.add(new_mood)
-    db.commit()
-    db.refresh(new_mood)
-
-    # generate recommendation (now passes score too)
-    recommendation = nlp.get_recommendation(
-        analysis.get("sentiment"),
-        analysis.get("emotion"),
-        analysis.get("score", 0.0),
-    )
+    new_entry.mood_analysis = new_mood
+    db.add(new_entry)
+    await sync.lock_changes(db, current_user.id)
+    await db.commit()
+    after_write(current_user.id)
+    await replicas.pin_client(response, db, current_user.id)
+
+    return {"msg": "Journal entry created", "entry": _serialize_entry(new_entry)}
+
 
+# ----------------- GET -----------------
+def _serialize_entry_meta(e: models.JournalEntry) -> dict:
+    """
+    Plain dict of everything but the text. Routes let their response_model
+    validate and encode it in pydantic-core; building dicts is several times
+    cheaper than constructing model instances (scripts/bench_serialization.py).
+    """
+    mood = None
+    if e.mood_analysis:
+        m = e.mood_analysis
+        mood = {
+            "id": m.id,
+            "sentiment": m.sentiment,
+            "emotion": m.emotion,
+            "score": m.score,
+            "created_at": m.created_at,
+            # generate recommendation (now passes score too)
+            "recommendation": nlp.get_recommendation(m.sentiment, m.emotion, m.score),
+        }
     return {
-        "msg": "Journal entry created",
-        "entry": {
-            "id": new_entry.id,
-            "content": new_entry.content,
-            "created_at": new_entry.created_at,
-            "mood_analysis": {
-                "id": new_mood.id,
-                "sentiment": new_mood.sentiment,
-                "emotion": new_mood.emotion,
-                "score": new_mood.score,
-                "created_at": new_mood.created_at,
-                "recommendation": recommendation,
-            },
-        },
+        "id": e.id,
+        "created_at": e.created_at,
+        "updated_at": e.updated_at,
+        "mood_analysis": mood,
     }
 
 
-# ----------------- GET -----------------
-@router.get("/")
-def get_journal_entries(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+def _serialize_entry(e: models.JournalEntry) -> dict:
+    """JournalOut shape."""
+    item = _serialize_entry_meta(e)
+    item["content"] = e.content
+    return item
+
+
+def _serialize_preview(e: models.JournalEntry, prefix: str, chars: int) -> dict:
+    """JournalPreviewOut shape; `prefix` holds chars + 1 characters to detect truncation."""
+    item = _serialize_entry_meta(e)
+    item["preview"] = prefix[:chars]
+    item["truncated"] = len(prefix) > chars
+    return item
+
+
+@router.get("/", response_model=Union[JournalListOut, JournalPreviewListOut])
+async def get_journal_entries(
+    start: Optional[datetime] = Query(None, description="Only entries created at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only entries created before this time"),
+    preview: bool = Query(False, description="Return a content prefix instead of the full text"),
+    preview_chars: int = Query(settings.JOURNAL_PREVIEW_CHARS, ge=1, le=2000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    entries = (
-        db.query(models.JournalEntry)
-        .filter(models.JournalEntry.user_id == current_user.id)
+    start, end = _naive_utc(start), _naive_utc(end)
+    # the cache holds the encoded JSON, so a hit skips serialization entirely
+    cache_key = (current_user.id, "list", start, end, preview and preview_chars)
+    cached = entries_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+    # taken before the query: a write that invalidates meanwhile keeps this body out
+    generation = entries_cache.generation()
+
+    # bounds on created_at let Postgres skip whole monthly partitions
+    stmt = (
+        select(models.JournalEntry)
+        .options(selectinload(models.JournalEntry.mood_analysis))
+        .where(models.JournalEntry.user_id == current_user.id)
         .order_by(models.JournalEntry.created_at.desc())
-        .all()
     )
+    if start is not None:
+        stmt = stmt.where(models.JournalEntry.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.JournalEntry.created_at < end)
 
-    out = []
-    for e in entries:
-        mood = None
-        if e.mood_analysis:
-            m = e.mood_analysis
-            mood = {
-                "id": m.id,
-                "sentiment": m.sentiment,
-                "emotion": m.emotion,
-                "score": m.score,
-                "created_at": m.created_at,
-                "recommendation": nlp.get_recommendation(m.sentiment, m.emotion, m.score),
-            }
-        out.append(
-            {
-                "id": e.id,
-                "content": e.content,
-                "created_at": e.created_at,
-                "updated_at": e.updated_at,
-                "mood_analysis": mood,
-            }
-        )
-    return {"entries": out}
+    if preview:
+        # the prefix is cut in SQL (substr only detoasts the slice it needs)
+        # and the full content column is never loaded; one extra character
+        # tells whether the text was truncated
+        stmt = stmt.add_columns(
+            func.substr(models.JournalEntry.content, 1, preview_chars + 1)
+        ).options(defer(models.JournalEntry.content))
+        rows = [tuple(r) for r in (await db.execute(stmt)).all()]
+        archived = await archive.read_entries(db, current_user.id, start, end)
+        if archived:
+            rows = sorted(
+                rows + [(e, e.content[:preview_chars + 1]) for e in archived],
+                key=lambda r: r[0].created_at,
+                reverse=True,
+            )
+        items = [_serialize_preview(e, prefix, preview_chars) for e, prefix in rows]
+    else:
+        entries = list((await db.scalars(stmt)).all())
+        archived = await archive.read_entries(db, current_user.id, start, end)
+        if archived:
+            entries = sorted(entries + archived, key=lambda e: e.created_at, reverse=True)
+        items = [_serialize_entry(e) for e in entries]
 
+    # the largest response: encoded straight from the dicts with orjson,
+    # skipping per-row validation; default=str covers asyncpg's UUID subclass
+    body = orjson.dumps({"entries": items}, default=str)
+    entries_cache.set(cache_key, body, generation)
+    return Response(body, media_type="application/json")
 
-# ----------------- DELETE -----------------
-@router.delete("/{entry_id}")
-def delete_journal_entry(
-    entry_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+
+# ----------------- DELTA SYNC -----------------
+@router.get("/changes", response_model=JournalChangesOut)
+async def get_journal_changes(
+    since: Optional[str] = Query(None, description="Token from a previous sync; omit for a full sync"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    entry = (
-        db.query(models.JournalEntry)
-        .filter(
-            models.JournalEntry.id == entry_id,
+    """
+    Entries created/updated and ids deleted after `since`, ordered by change_seq.
+    Keep calling with `next_token` while `has_more` is true.
+    """
+    try:
+        since_seq, issued_at = sync.decode_token(since)
+    except sync.TokenExpired:
+        raise HTTPException(status_code=410, detail="Sync token expired, do a full sync")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    # one snapshot for all three reads; with writers serialised per user
+    # (sync.lock_changes) it holds a gap-free prefix of the user's seqs
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    entries = list((await db.scalars(
+        select(models.JournalEntry)
+        .options(selectinload(models.JournalEntry.mood_analysis))
+        .where(
             models.JournalEntry.user_id == current_user.id,
+            models.JournalEntry.change_seq > since_seq,
         )
-        .first()
+        .order_by(models.JournalEntry.change_seq)
+        .limit(limit)
+    )).all())
+    tombstones = []
+    if since is not None:
+        # a full sync has nothing to delete on the client
+        tombstones = (await db.scalars(
+            select(models.JournalTombstone)
+            .where(
+                models.JournalTombstone.user_id == current_user.id,
+                models.JournalTombstone.change_seq > since_seq,
+            )
+            .order_by(models.JournalTombstone.change_seq)
+            .limit(limit)
+        )).all()
+    # a full stream caps the page at its last seq; archived rows past it wait
+    caps = [rows[-1].change_seq for rows in (entries, tombstones) if len(rows) == limit]
+    archived = await archive.read_entries(
+        db,
+        current_user.id,
+        min_change_seq=since_seq,
+        max_change_seq=min(caps, default=None),
+        limit=limit,
     )
-    if not entry:
+
+    # merge the streams by seq and cut one page off the front
+    changes = sorted(
+        [(e.change_seq, e) for e in entries + archived] + [(t.change_seq, t) for t in tombstones],
+        key=lambda c: c[0],
+    )
+    has_more = len(changes) > limit or bool(caps) or len(archived) == limit
+    page = changes[:limit]
+    next_seq = page[-1][0] if page else since_seq
+
+    return {
+        "entries": [_serialize_entry(c) for _, c in page if isinstance(c, models.JournalEntry)],
+        "deleted": [c.entry_id for _, c in page if isinstance(c, models.JournalTombstone)],
+        "next_token": sync.encode_token(next_seq, issued_at if has_more else None),
+        "has_more": has_more,
+    }
+
+
+# ----------------- DELETE -----------------
+@router.delete("/{entry_id}", response_model=MessageOut)
+async def delete_journal_entry(
+    entry_id: uuid.UUID,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # the batch statements with one id: no ORM load before the DELETE
+    user_id = current_user.id
+    deleted, _ = await _apply_batch(db, user_id, [entry_id], {})
+    if not deleted and await archive.restore_entry(user_id, entry_id):
+        deleted, _ = await _apply_batch(db, user_id, [entry_id], {})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Journal entry not found")
-    db.delete(entry)
-    db.commit()
+    after_write(user_id)
+    await replicas.pin_client(response, db, user_id)
     return {"msg": "Journal entry deleted"}
 
 
 # ----------------- UPDATE -----------------
-@router.put("/{entry_id}")
-def update_entry(
+@router.put(
+    "/{entry_id}",
+    response_model=JournalWriteOut,
+    dependencies=[Depends(rate_limit(update_limiter))],
+)
+async def update_entry(
     entry_id: uuid.UUID,
-    entry_data: JournalEntryUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    entry_data: JournalUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    entry = (
-        db.query(models.JournalEntry)
-        .filter_by(id=entry_id, user_id=current_user.id)
-        .first()
+    user_id = current_user.id  # read before any rollback expires it
+    # cheap ownership check first: unknown or foreign ids must not cost an inference slot
+    found = await db.scalar(
+        select(models.JournalEntry.id).where(
+            models.JournalEntry.id == entry_id,
+            models.JournalEntry.user_id == user_id,
+        )
     )
-    if not entry:
+    # end the read so no transaction (or pooled connection) is held during inference
+    await db.rollback()
+    # archived entries are moved back to the hot tables before editing
+    if found is None and not await archive.restore_entry(user_id, entry_id):
         raise HTTPException(status_code=404, detail="Entry not found")
 
-    entry.content = entry_data.content
-    entry.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(entry)
+    # then re-run Hugging Face inference, outside the transaction
+    analysis = await _analyze_admitted(entry_data.content)
+    now = datetime.utcnow()
 
-    # re-run Hugging Face inference
-    try:
-        analysis = nlp.analyze_mood(entry.content)
-    except Exception:
-        analysis = {"sentiment": "unknown", "emotion": "unknown", "score": 0.0}
-
-    # update mood_analysis row (UNIQUE ensures one per entry)
-    mood = db.query(models.MoodAnalysis).filter_by(entry_id=entry.id).first()
-    if mood:
-        mood.sentiment = analysis["sentiment"]
-        mood.emotion = analysis["emotion"]
-        mood.score = analysis["score"]
-        mood.created_at = datetime.utcnow()
-        db.commit()
-        db.refresh(mood)
-
-    # generate recommendation (now passes score too)
-    recommendation = nlp.get_recommendation(
-        analysis.get("sentiment"),
-        analysis.get("emotion"),
-        analysis.get("score", 0.0),
+    stmt = (
+        update(models.JournalEntry)
+        .where(
+            models.JournalEntry.id == entry_id,
+            models.JournalEntry.user_id == user_id,
+        )
+        .values(
+            content=entry_data.content,
+            updated_at=now,
+            change_seq=models.journal_change_seq.next_value(),
+        )
+        .returning(
+            models.JournalEntry.id,
+            models.JournalEntry.content,
+            models.JournalEntry.created_at,
+            models.JournalEntry.updated_at,
+        )
+        .execution_options(synchronize_session=False)
     )
+    await sync.lock_changes(db, user_id)
+    entry = (await db.execute(stmt)).first()
+    if not entry:
+        # deleted while the analysis ran
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    # upsert the mood_analysis row (UNIQUE(entry_id, entry_created_at) ensures one per entry)
+    mood_values = {
+        "sentiment": analysis.get("sentiment", "unknown"),
+        "emotion": analysis.get("emotion", "unknown"),
+        "score": analysis.get("score", 0.0),
+        "created_at": now,
+    }
+    mood = (await db.execute(
+        pg_insert(models.MoodAnalysis)
+        .values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            entry_id=entry.id,
+            entry_created_at=entry.created_at,
+            **mood_values,
+        )
+        .on_conflict_do_update(index_elements=["entry_id", "entry_created_at"], set_=mood_values)
+        .returning(models.MoodAnalysis.id, models.MoodAnalysis.created_at)
+    )).first()
+    await db.commit()
+    after_write(user_id)
+    await replicas.pin_client(response, db, user_id)
 
     return {
         "msg": "Entry and analysis updated successfully",
         "entry": {
             "id": entry.id,
             "content": entry.content,
+            "created_at": entry.created_at,
             "updated_at": entry.updated_at,
             "mood_analysis": {
-                "id": mood.id if mood else None,
-                "sentiment": analysis.get("sentiment"),
-                "emotion": analysis.get("emotion"),
-                "score": analysis.get("score"),
-                "created_at": mood.created_at if mood else None,
-                "recommendation": recommendation,
+                "id": mood.id,
+                "sentiment": mood_values["sentiment"],
+                "emotion": mood_values["emotion"],
+                "score": mood_values["score"],
+                "created_at": mood.created_at,
+                # generate recommendation (now passes score too)
+                "recommendation": nlp.get_recommendation(
+                    mood_values["sentiment"], mood_values["emotion"], mood_values["score"]
+                ),
             },
         },
     }
+
+
+# ----------------- BATCH -----------------
+_UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+
+def _batch_delete_stmt(user_id: uuid.UUID, ids: List[uuid.UUID]):
+    # one array parameter: the same prepared statement for any number of ids
+    Entry = models.JournalEntry
+    return (
+        delete(Entry)
+        .where(Entry.user_id == user_id, Entry.id == any_(bindparam("ids", ids, type_=_UUID_ARRAY)))
+        .returning(Entry.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _batch_update_stmt(user_id: uuid.UUID, contents: Dict[uuid.UUID, str], now: datetime):
+    """UPDATE ... FROM unnest(ids, contents): every edit in one statement."""
+    Entry = models.JournalEntry
+    batch = (
+        func.unnest(
+            bindparam("ids", list(contents), type_=_UUID_ARRAY),
+            bindparam("contents", list(contents.values()), type_=ARRAY(Text)),
+        )
+        .table_valued(column("id", PG_UUID(as_uuid=True)), column("content", Text))
+        .render_derived(name="batch")
+    )
+    return (
+        update(Entry)
+        .where(Entry.id == batch.c.id, Entry.user_id == user_id)
+        .values(
+            content=batch.c.content,
+            updated_at=now,
+            change_seq=models.journal_change_seq.next_value(),
+        )
+        .returning(Entry.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _apply_batch(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    delete_ids: List[uuid.UUID],
+    contents: Dict[uuid.UUID, str],
+) -> Tuple[Set[uuid.UUID], Set[uuid.UUID]]:
+    """Deletes (plus their tombstones) and edits in one transaction; returns the ids hit."""
+    deleted: Set[uuid.UUID] = set()
+    updated: Set[uuid.UUID] = set()
+    if delete_ids or contents:
+        await sync.lock_changes(db, user_id)
+    if delete_ids:
+        # mood_analysis rows go with the (entry_id, entry_created_at) cascade
+        deleted = set((await db.scalars(_batch_delete_stmt(user_id, delete_ids))).all())
+        if deleted:
+            await db.execute(
+                insert(models.JournalTombstone),
+                [{"entry_id": entry_id, "user_id": user_id} for entry_id in deleted],
+            )
+    if contents:
+        updated = set((await db.scalars(_batch_update_stmt(user_id, contents, datetime.utcnow()))).all())
+    await db.commit()
+    return deleted, updated
+
+
+@router.post(
+    "/batch",
+    response_model=JournalBatchOut,
+    response_model_exclude_none=True,
+)
+async def batch_journal_entries(
+    batch: JournalBatch,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Delete and edit many entries in one call, with one status per id. Edited
+    entries keep their previous mood analysis until the batched re-analysis
+    that runs after the response replaces it. Every edit costs one token of
+    the user's update rate limit, like a PUT; deletes share a single token.
+    """
+    if len(batch.delete) + len(batch.update) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch limited to {settings.BATCH_MAX_ITEMS} entries per request",
+        )
+    user_id = current_user.id
+    delete_ids = list(dict.fromkeys(batch.delete))
+    contents = {item.id: item.content for item in batch.update}  # last edit of an id wins
+    conflicts = contents.keys() & set(delete_ids)
+    delete_ids = [entry_id for entry_id in delete_ids if entry_id not in conflicts]
+    for entry_id in conflicts:
+        del contents[entry_id]
+    if settings.RATE_LIMIT_ENABLED and len(contents) > update_limiter.burst:
+        # could never be admitted as a whole; the client has to split it
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {update_limiter.burst} edits per batch, split the batch",
+        )
+    charge(update_limiter, user_id, cost=max(1, len(contents)))
+
+    deleted, updated = await _apply_batch(db, user_id, delete_ids, contents)
+    missing = (set(delete_ids) - deleted) | (contents.keys() - updated)
+    if missing:
+        # archived entries are moved back to the hot tables first, as for single writes
+        restored = await archive.restore_entries(user_id, missing)
+        if restored:
+            more_deleted, more_updated = await _apply_batch(
+                db,
+                user_id,
+                [entry_id for entry_id in delete_ids if entry_id in restored],
+                {entry_id: c for entry_id, c in contents.items() if entry_id in restored},
+            )
+            deleted |= more_deleted
+            updated |= more_updated
+
+    results = []
+    for op, ids, done, status in (
+        ("delete", delete_ids, deleted, "deleted"),
+        ("update", list(contents), updated, "updated"),
+    ):
+        for entry_id in ids:
+            if entry_id in done:
+                results.append({"id": entry_id, "op": op, "status": status})
+            else:
+                results.append({
+                    "id": entry_id, "op": op, "status": "error", "detail": "Journal entry not found",
+                })
+    for entry_id in conflicts:
+        for op in ("delete", "update"):
+            results.append({
+                "id": entry_id, "op": op, "status": "error",
+                "detail": "Entry both deleted and updated in one batch",
+            })
+
+    if deleted or updated:
+        after_write(user_id)
+        await replicas.pin_client(response, db, user_id)
+    if updated:
+        background_tasks.add_task(analyze_entries, user_id, list(updated))
+
+    return {
+        "msg": "Batch finished",
+        "deleted": len(deleted),
+        "updated": len(updated),
+        "failed": len(results) - len(deleted) - len(updated),
+        "results": results,
+    }
+
+
+# ----------------- BULK IMPORT -----------------
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def _iter_import_items(request: Request):
+    """
+    Yield (index, raw_item, error) from either a JSON array body or an NDJSON
+    stream. NDJSON is parsed line by line as it arrives; a JSON array has to be
+    read whole, so large migrations should prefer NDJSON.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_TYPES:
+        index = 0
+        buf = b""
+        async for chunk in request.stream():
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield index, json.loads(line), None
+                except ValueError:
+                    yield index, None, "Invalid JSON line"
+                index += 1
+        if buf.strip():
+            try:
+                yield index, json.loads(buf), None
+            except ValueError:
+                yield index, None, "Invalid JSON line"
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for index, raw in enumerate(items):
+        yield index, raw, None
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def _insert_import_chunk(db: AsyncSession, user_id: uuid.UUID, chunk: list) -> list:
+    """Insert one chunk with a single multi-row INSERT and commit."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "content": item.content,
+            "created_at": item.created_at or now,
+        }
+        for _, item in chunk
+    ]
+    try:
+        await sync.lock_changes(db, user_id)
+        await db.execute(insert(models.JournalEntry), rows)
+        await db.commit()
+    except Exception as exc:
+        # report this chunk as failed but keep the results of committed ones
+        if not isinstance(exc, SQLAlchemyError):
+            logger.exception("Import chunk of %d entries failed", len(chunk))
+        await db.rollback()
+        return [
+            {"index": index, "status": "error", "detail": "Could not store entry"}
+            for index, _ in chunk
+        ]
+    return [
+        {"index": index, "status": "created", "id": row["id"]}
+        for (index, _), row in zip(chunk, rows)
+    ]
+
+
+@router.post(
+    "/import",
+    response_model=JournalImportOut,
+    response_model_exclude_none=True,
+    dependencies=[Depends(rate_limit(import_limiter))],
+)
+async def import_journal_entries(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Bulk import: JSON array or NDJSON of {"content": ..., "created_at": ...}.
+    Entries are committed in chunks; mood analysis runs afterwards in batches,
+    behind the inference gate. Every chunk costs one token of the user's
+    import rate limit (the first one before the body is read). When the
+    bucket runs dry, the rejected chunk is reported as errors and the rest of
+    the body is not read; the client resumes from the first rejected index.
+    """
+    user_id = current_user.id
+    results = []
+    chunk = []
+    chunks = 0
+    limited = False
+    # partitions are created ahead by the scheduler leader, never here: rows
+    # for a month without one are rejected instead of running DDL per request
+    months = await partitions.attached_months()
+
+    async def flush():
+        nonlocal chunks, limited
+        if chunks:
+            try:
+                charge(import_limiter, user_id)
+            except RateLimited as exc:
+                limited = True
+                results.extend(
+                    {
+                        "index": index,
+                        "status": "error",
+                        "detail": f"Import rate limit reached, retry in {exc.retry_after}s",
+                    }
+                    for index, _ in chunk
+                )
+                chunk.clear()
+                return
+        chunks += 1
+        results.extend(await _insert_import_chunk(db, user_id, chunk))
+        chunk.clear()
+
+    async for index, raw, error in _iter_import_items(request):
+        if index >= settings.IMPORT_MAX_ITEMS:
+            results.append({
+                "index": index,
+                "status": "error",
+                "detail": f"Import limited to {settings.IMPORT_MAX_ITEMS} entries per request",
+            })
+            break
+        if error is None:
+            try:
+                item = JournalImportItem.model_validate(raw)
+            except ValidationError as exc:
+                error = exc.errors(include_url=False)[0]["msg"]
+            else:
+                created_at = item.created_at or datetime.utcnow()
+                if partitions.month_start(created_at) in months:
+                    chunk.append((index, item))
+                else:
+                    error = (
+                        f"No partition for {created_at:%Y-%m}: imports accept the last "
+                        f"{settings.PARTITION_MONTHS_BACK} months and the current one"
+                    )
+        if error is not None:
+            results.append({"index": index, "status": "error", "detail": error})
+        if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+            await flush()
+            if limited:
+                break
+    if chunk:
+        await flush()
+    results.sort(key=lambda r: r["index"])
+
+    created_ids = [r["id"] for r in results if r["status"] == "created"]
+    if created_ids:
+        after_write(user_id)
+        await replicas.pin_client(response, db, user_id)
+        background_tasks.add_task(analyze_entries, user_id, created_ids)
+
+    return {
+        "msg": "Import finished",
+        "created": len(created_ids),
+        "failed": len(results) - len(created_ids),
+        "results": results,
+    }
+
+
+# ----------------- EXPORT -----------------
+EXPORT_COLUMNS = (
+    "id",
+    "content",
+    "created_at",
+    "updated_at",
+    "sentiment",
+    "emotion",
+    "score",
+    "analyzed_at",
+)
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+async def _iter_export_rows(user_id: uuid.UUID, min_lsn: Optional[int]) -> AsyncIterator[tuple]:
+    """
+    Stream (entry, mood) rows through a server-side cursor, merged in
+    created_at order with the user's archived segments. Uses its own session
+    because the response body outlives the request dependencies.
+    """
+    async with replicas.read_sessionmaker(user_id, min_lsn)() as db:
+        segments = await archive.list_segments(db, user_id)
+        stmt = (
+            select(
+                models.JournalEntry.id,
+                models.JournalEntry.content,
+                models.JournalEntry.created_at,
+                models.JournalEntry.updated_at,
+                models.MoodAnalysis.sentiment,
+                models.MoodAnalysis.emotion,
+                models.MoodAnalysis.score,
+                models.MoodAnalysis.created_at,
+            )
+            .outerjoin(
+                models.MoodAnalysis,
+                (models.MoodAnalysis.entry_id == models.JournalEntry.id)
+                & (models.MoodAnalysis.entry_created_at == models.JournalEntry.created_at),
+            )
+            .where(models.JournalEntry.user_id == user_id)
+            .order_by(models.JournalEntry.created_at)
+            .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        hot = await db.stream(stmt)
+        archived = (
+            (r["id"], r["content"], r["created_at"], r["updated_at"],
+             r["sentiment"], r["emotion"], r["score"], r["analyzed_at"])
+            async for r in archive.iter_segment_rows(segments)
+        )
+        async for row in _merge_by_created_at(hot, archived):
+            yield tuple(_export_value(v) for v in row)
+
+
+async def _merge_by_created_at(a: AsyncIterator[tuple], b: AsyncIterator[tuple]) -> AsyncIterator[tuple]:
+    """Merge two row streams already sorted by created_at (column 2)."""
+    x, y = await anext(a, None), await anext(b, None)
+    while x is not None and y is not None:
+        if x[2] <= y[2]:
+            yield x
+            x = await anext(a, None)
+        else:
+            yield y
+            y = await anext(b, None)
+    while x is not None:
+        yield x
+        x = await anext(a, None)
+    while y is not None:
+        yield y
+        y = await anext(b, None)
+
+
+async def _encode_export(rows: AsyncIterator[tuple], fmt: str, gzip: bool) -> AsyncIterator[bytes]:
+    """Encode rows incrementally, yielding roughly EXPORT_FLUSH_BYTES at a time."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    text = io.StringIO()
+    writer = csv.writer(text) if fmt == "csv" else None
+
+    def drain(final: bool = False) -> bytes:
+        data = text.getvalue().encode("utf-8")
+        text.seek(0)
+        text.truncate()
+        if compressor is None:
+            return data
+        out = compressor.compress(data)
+        return out + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    if writer is not None:
+        writer.writerow(EXPORT_COLUMNS)
+    # send the header (or gzip magic) right away to keep time-to-first-byte low
+    yield drain()
+
+    async for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            text.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+            text.write("\n")
+        if text.tell() >= EXPORT_FLUSH_BYTES:
+            yield drain()
+    yield drain(final=True)
+
+
+@router.get("/export")
+async def export_journal_entries(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False),
+    current_user: Principal = Depends(get_current_user),
+    min_lsn: Optional[int] = Depends(replicas.client_lsn),
+):
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    filename = f"journal-export.{fmt}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        _encode_export(_iter_export_rows(current_user.id, min_lsn), fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ----------------- GET ONE -----------------
+# declared last so "/export", "/changes" etc. are matched before "/{entry_id}"
+@router.get("/{entry_id}", response_model=JournalOut)
+async def get_journal_entry(
+    entry_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Full text of one entry, e.g. after listing with ?preview=true."""
+    entry = await db.scalar(
+        select(models.JournalEntry)
+        .options(selectinload(models.JournalEntry.mood_analysis))
+        .where(
+            models.JournalEntry.id == entry_id,
+            models.JournalEntry.user_id == current_user.id,
+        )
+    )
+    if entry is None:
+        entry = await archive.find_entry(db, current_user.id, entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Journal entry not found")
+    return _serialize_entry(entry)
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.db.models import User
+from app.db.models import AccountDeletion, RefreshToken, User
 from app.db.database import get_db
-from app.auth.auth import get_password_hash, verify_password, create_access_token
+from app.auth.auth import (
+    decode_access_token, decode_refresh_token, get_current_user, issue_tokens, oauth2_scheme,
+)
+from app.auth.passwords import hash_password, verify_and_update
+from app.auth.principal import Principal, invalidate_principal
+from app.auth.revocation import revoke_access_token, revoke_user_tokens
 import random, string
+from typing import Optional
 from datetime import datetime, timedelta
-from fastapi_mail import FastMail, MessageSchema
-from app.schemas.user_schemas import UserRegister, UserLogin, VerifyOTP
-from app.core.config import mail_conf  # 👈 import shared mail config
+from app.schemas.user_schemas import LogoutRequest, RefreshRequest, UserRegister, UserLogin, VerifyOTP
+from app.services import account_deletion, email_outbox
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -20,8 +26,8 @@ def generate_otp(length=6):
 
 # ---- Verify OTP ----
 @router.post("/verify")
-def verify_user(data: VerifyOTP, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def verify_user(data: VerifyOTP, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if user.is_verified:
@@ -32,25 +38,26 @@ def verify_user(data: VerifyOTP, db: Session = Depends(get_db)):
     user.is_verified = True
     user.otp_code = None
     user.otp_expiry = None
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
     return {"msg": "Account verified successfully"}
 
 
 # ---- Register ----
 @router.post("/register", status_code=201)
-async def register(data: UserRegister, db: Session = Depends(get_db)):
+async def register(data: UserRegister, db: AsyncSession = Depends(get_db)):
     # Check if username/email exists
-    existing = db.query(User).filter(
+    existing = await db.scalar(select(User).where(
         (User.username == data.username) | (User.email == data.email)
-    ).first()
+    ))
     if existing:
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
-    hashed_password = get_password_hash(data.password)
+    # bcrypt runs on its own bounded pool, not the shared threadpool
+    hashed_password = await hash_password(data.password)
     otp = generate_otp()
     expiry = datetime.utcnow() + timedelta(minutes=10)
 
-    # Create user object but do NOT commit yet
     new_user = User(
         username=data.username,
         email=data.email,
@@ -60,38 +67,118 @@ async def register(data: UserRegister, db: Session = Depends(get_db)):
         otp_expiry=expiry
     )
 
-    # Send OTP email first
-    fm = FastMail(mail_conf)
-    message = MessageSchema(
+    # The OTP mail is queued in the same transaction and sent by the outbox
+    # worker, so signup latency doesn't include the SMTP round-trips.
+    db.add(new_user)
+    email_outbox.enqueue(
+        db,
+        recipient=data.email,
         subject="Your OTP Code",
-        recipients=[data.email],
         body=f"Your verification code is {otp}. It expires in 10 minutes.",
-        subtype="plain"
     )
-
-    try:
-        await fm.send_message(message)
-    except Exception as e:
-        # Fail gracefully if email sending fails
-        raise HTTPException(status_code=500, detail=f"Could not send email: {str(e)}")
-
-    # Only now add to DB if email succeeded
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    email_outbox.notify()
 
     return {"msg": "User registered successfully. Check your email for OTP."}
 
 
 # ---- Login ----
 @router.post("/login")
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()  # use email
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))  # use email
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    ok, new_hash = await verify_and_update(data.password, user.hashed_password)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if not user.is_verified:
         raise HTTPException(status_code=403, detail="Account not verified. Please check your email.")
-
-    token = create_access_token({"sub": str(user.id)})
-    return {"access_token": token, "token_type": "bearer"}
-
+    if await db.get(AccountDeletion, user.id) is not None:
+        raise HTTPException(status_code=403, detail="Account is being deleted.")
+    if new_hash is not None:
+        # cost factor changed since this hash was made; stored with the login commit
+        user.hashed_password = new_hash
+
+    tokens = issue_tokens(db, user.id)
+    await db.commit()
+    return tokens
+
+
+# ---- Refresh ----
+@router.post("/refresh")
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Trade a refresh token for a new access + refresh pair; the old one is spent."""
+    jti = decode_refresh_token(data.refresh_token)
+    now = datetime.utcnow()
+    token = await db.scalar(
+        select(RefreshToken).where(RefreshToken.id == jti).with_for_update()
+    )
+    if token is None or token.expires_at <= now or token.revoked_at is not None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    if token.used_at is not None:
+        # a spent token came back: it may have leaked, so end the whole session
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == token.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        await db.commit()
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    token.used_at = now
+    tokens = issue_tokens(db, token.user_id, token.family_id)
+    await db.commit()
+    return tokens
+
+
+# ---- Logout ----
+@router.post("/logout")
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    data = data or LogoutRequest()
+    if data.everywhere:
+        await revoke_user_tokens(db, current_user.id)
+        return {"msg": "Logged out everywhere"}
+
+    if data.refresh_token:
+        jti = decode_refresh_token(data.refresh_token)
+        family_id = (
+            select(RefreshToken.family_id)
+            .where(RefreshToken.id == jti, RefreshToken.user_id == current_user.id)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+    claims = decode_access_token(token)
+    if claims.jti is not None:
+        await revoke_access_token(db, current_user.id, claims.jti, claims.exp)
+    else:
+        await db.commit()
+    return {"msg": "Logged out"}
+
+
+# ---- Delete account ----
+@router.delete("/me", status_code=202)
+async def delete_me(
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Start deleting the account and all its data. Every token is revoked at
+    once; the data goes in batches in the background (resumed by the
+    scheduler if interrupted).
+    """
+    user_id = current_user.id
+    await account_deletion.request_deletion(db, user_id)
+    await revoke_user_tokens(db, user_id)
+    invalidate_principal(user_id)
+    background_tasks.add_task(account_deletion.delete_account, user_id)
+    return {"msg": "Account deletion started"}
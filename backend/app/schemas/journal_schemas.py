@@ -1,37 +1,112 @@
 # backend/app/schemas/journal_schemas.py
-from pydantic import BaseModel
-from typing import Optional
+import uuid
 from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
 
 class MoodAnalysisBase(BaseModel):
     sentiment: str
     emotion: str
-    score: float
+    score: Optional[float] = None
+
 
 class MoodAnalysisOut(MoodAnalysisBase):
-    id: str
-    entry_id: str
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
     created_at: datetime
+    recommendation: Optional[str] = None
 
-    class Config:
-        orm_mode = True
 
 class JournalBase(BaseModel):
-    text: str
+    content: str
+
 
 class JournalCreate(JournalBase):
     pass
 
-class JournalUpdate(BaseModel):
-    text: Optional[str] = None
+
+class JournalUpdate(JournalBase):
+    pass
+
+
+class JournalBatchUpdate(JournalBase):
+    id: uuid.UUID
+
+
+class JournalBatch(BaseModel):
+    delete: List[uuid.UUID] = []
+    update: List[JournalBatchUpdate] = []
+
 
 class JournalOut(BaseModel):
-    id: str
-    user_id: str
-    text: str
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    content: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    mood_analysis: Optional[MoodAnalysisOut] = None
+
+
+class JournalPreviewOut(BaseModel):
+    """List item in preview mode: a bounded prefix instead of the full content."""
+    id: uuid.UUID
+    preview: str
+    truncated: bool
     created_at: datetime
-    updated_at: Optional[datetime]
+    updated_at: Optional[datetime] = None
     mood_analysis: Optional[MoodAnalysisOut] = None
 
-    class Config:
-        orm_mode = True
+
+# ---- response envelopes ----
+class MessageOut(BaseModel):
+    msg: str
+
+
+class JournalWriteOut(MessageOut):
+    entry: JournalOut
+
+
+class JournalListOut(BaseModel):
+    entries: List[JournalOut]
+
+
+class JournalPreviewListOut(BaseModel):
+    entries: List[JournalPreviewOut]
+
+
+class JournalChangesOut(BaseModel):
+    entries: List[JournalOut]
+    deleted: List[uuid.UUID]
+    next_token: str
+    has_more: bool
+
+
+class ImportResultOut(BaseModel):
+    index: int
+    status: str
+    id: Optional[uuid.UUID] = None
+    detail: Optional[str] = None
+
+
+class JournalImportOut(MessageOut):
+    created: int
+    failed: int
+    results: List[ImportResultOut]
+
+
+class BatchResultOut(BaseModel):
+    id: uuid.UUID
+    op: str
+    status: str
+    detail: Optional[str] = None
+
+
+class JournalBatchOut(MessageOut):
+    deleted: int
+    updated: int
+    failed: int
+    results: List[BatchResultOut]
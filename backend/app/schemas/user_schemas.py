@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr
 
 class UserRegister(BaseModel):
@@ -12,3 +14,10 @@ class UserLogin(BaseModel):
 class VerifyOTP(BaseModel):
     email: EmailStr
     otp: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None  # also end this refresh token's session
+    everywhere: bool = False  # revoke every token of the account
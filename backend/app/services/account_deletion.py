@@ -0,0 +1,179 @@
+# backend/app/services/account_deletion.py
+"""
+Batched, resumable account deletion.
+
+DELETE /users/me records an account_deletions row, revokes the user's
+tokens and starts `delete_account` in the background. The user's data is
+removed in phases: mood analyses, journal entries, tombstones and archive
+segments (with their files), then the user row itself. Each phase deletes at
+most MAINTENANCE_BATCH_SIZE rows per transaction. Each transaction also
+updates the progress counters while holding the account_deletions row lock,
+so two runners never work on one account at the same time, and the counters
+are never ahead of what was actually deleted.
+
+A deletion that stopped half-way (crash, restart, error) is picked up by
+the scheduler's `resume_account_deletions` job.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.principal import invalidate_principal
+from app.core import metrics
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+from app.services import archive
+from app.services.journal_cache import after_write
+
+logger = logging.getLogger(__name__)
+
+
+async def request_deletion(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """Record the request (idempotent) and commit."""
+    await db.execute(
+        pg_insert(models.AccountDeletion)
+        .values(user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    await db.commit()
+
+
+def _moods_batch(user_id: uuid.UUID, limit: int):
+    Mood = models.MoodAnalysis
+    keys = select(Mood.id, Mood.entry_created_at).where(Mood.user_id == user_id).limit(limit)
+    return delete(Mood).where(tuple_(Mood.id, Mood.entry_created_at).in_(keys))
+
+
+def _entries_batch(user_id: uuid.UUID, limit: int):
+    Entry = models.JournalEntry
+    keys = select(Entry.id, Entry.created_at).where(Entry.user_id == user_id).limit(limit)
+    return delete(Entry).where(tuple_(Entry.id, Entry.created_at).in_(keys))
+
+
+def _tombstones_batch(user_id: uuid.UUID, limit: int):
+    Tombstone = models.JournalTombstone
+    keys = select(Tombstone.entry_id).where(Tombstone.user_id == user_id).limit(limit)
+    return delete(Tombstone).where(Tombstone.entry_id.in_(keys))
+
+
+# progress column -> batch statement, in order; segments go through the archive service
+PHASES = {
+    "moods_deleted": _moods_batch,
+    "entries_deleted": _entries_batch,
+    "tombstones_deleted": _tombstones_batch,
+    "segments_deleted": None,
+}
+
+
+def _batch_size(phase: str) -> int:
+    if phase == "segments_deleted":
+        # each segment is a file to remove; keep these transactions short
+        return max(1, settings.MAINTENANCE_BATCH_SIZE // 10)
+    return settings.MAINTENANCE_BATCH_SIZE
+
+
+async def _lock_progress(db: AsyncSession, user_id: uuid.UUID):
+    return await db.scalar(
+        select(models.AccountDeletion)
+        .where(models.AccountDeletion.user_id == user_id)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def _run_batch(user_id: uuid.UUID, phase: str) -> int:
+    """
+    One transaction: lock the progress row, delete one batch of `phase`,
+    bump its counter. Returns rows deleted, or -1 if someone else holds the
+    progress row (or it is gone / done).
+    """
+    limit = _batch_size(phase)
+    async with SessionLocal() as db:
+        progress = await _lock_progress(db, user_id)
+        if progress is None or progress.status == "done":
+            return -1
+        now = datetime.utcnow()
+        if progress.status == "pending":
+            progress.status, progress.started_at = "running", now
+
+        if phase == "segments_deleted":
+            deleted = await archive.delete_segments(db, user_id, limit)
+        else:
+            stmt = PHASES[phase](user_id, limit)
+            deleted = (await db.execute(stmt.execution_options(synchronize_session=False))).rowcount
+        setattr(progress, phase, getattr(progress, phase) + deleted)
+        progress.updated_at = now
+        progress.last_error = None
+        await db.commit()
+    metrics.inc("account_deletion_rows_total", deleted, kind=phase.replace("_deleted", ""))
+    return deleted
+
+
+async def _finish(user_id: uuid.UUID) -> bool:
+    async with SessionLocal() as db:
+        progress = await _lock_progress(db, user_id)
+        if progress is None or progress.status == "done":
+            return progress is not None
+        # anything left (refresh tokens, stragglers) goes with the database cascades
+        await db.execute(delete(models.User).where(models.User.id == user_id))
+        now = datetime.utcnow()
+        progress.status, progress.finished_at, progress.updated_at = "done", now, now
+        await db.commit()
+        started = progress.started_at or progress.requested_at
+    metrics.inc("account_deletions_total")
+    metrics.observe("account_deletion_seconds", (now - started).total_seconds())
+    return True
+
+
+async def delete_account(user_id: uuid.UUID) -> bool:
+    """Run or resume the deletion of `user_id`; True once it is complete."""
+    t0 = time.perf_counter()
+    try:
+        for phase in PHASES:
+            while True:
+                deleted = await _run_batch(user_id, phase)
+                if deleted < 0:
+                    return False  # another runner has it, or nothing to do
+                if deleted < _batch_size(phase):
+                    break
+                if settings.ACCOUNT_DELETION_PAUSE_SECONDS:
+                    # give replicas and autovacuum room on very large accounts
+                    await asyncio.sleep(settings.ACCOUNT_DELETION_PAUSE_SECONDS)
+        done = await _finish(user_id)
+    except Exception as exc:
+        logger.exception("Account deletion of %s failed; it will be resumed", user_id)
+        async with SessionLocal() as db:
+            progress = await db.get(models.AccountDeletion, user_id)
+            if progress is not None:
+                progress.last_error = repr(exc)[:1000]
+                progress.updated_at = datetime.utcnow()
+                await db.commit()
+        return False
+    finally:
+        after_write(user_id)
+        invalidate_principal(user_id)
+    if done:
+        logger.info("Deleted account %s in %.1fs", user_id, time.perf_counter() - t0)
+    return done
+
+
+async def resume_account_deletions() -> int:
+    """Scheduler job: finish deletions nobody has worked on for a while."""
+    stale = datetime.utcnow() - timedelta(seconds=settings.ACCOUNT_DELETION_STALE_SECONDS)
+    async with SessionLocal() as db:
+        user_ids = (await db.scalars(
+            select(models.AccountDeletion.user_id).where(
+                models.AccountDeletion.status != "done",
+                models.AccountDeletion.updated_at < stale,
+            )
+        )).all()
+    finished = 0
+    for user_id in user_ids:
+        finished += await delete_account(user_id)
+    return finished
@@ -0,0 +1,56 @@
+# backend/app/services/admission.py
+"""
+Admission control for the inference-heavy journal routes.
+
+POST / and PUT /{id} each translate and run two model calls, so every
+user gets a token bucket per route, and all analyses in this worker,
+request-driven or background, share one concurrency gate. Routes that
+analyse many entries per call charge one token per entry (batch edits) or
+per chunk of entries (imports).
+"""
+from fastapi import Depends
+
+from app.auth.auth import get_current_user
+from app.auth.principal import Principal
+from app.core.config import settings
+from app.core.ratelimit import ConcurrencyGate, TokenBucketLimiter
+
+create_limiter = TokenBucketLimiter(
+    "journal_create",
+    rate_per_minute=settings.RATE_LIMIT_CREATE_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_TRACKED_USERS,
+)
+update_limiter = TokenBucketLimiter(
+    "journal_update",
+    rate_per_minute=settings.RATE_LIMIT_UPDATE_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_TRACKED_USERS,
+)
+# POST /import, charged per chunk of IMPORT_CHUNK_SIZE rows
+import_limiter = TokenBucketLimiter(
+    "journal_import",
+    rate_per_minute=settings.RATE_LIMIT_IMPORT_CHUNKS_PER_MINUTE,
+    burst=settings.RATE_LIMIT_IMPORT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_TRACKED_USERS,
+)
+
+# in-flight mood analyses (translation + HF calls) in this worker
+inference_gate = ConcurrencyGate(
+    "inference",
+    limit=settings.INFERENCE_MAX_CONCURRENCY,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+)
+
+
+def charge(limiter: TokenBucketLimiter, user_id, cost: float = 1.0) -> None:
+    """Take `cost` tokens from the user's bucket (RateLimited if it is short)."""
+    if settings.RATE_LIMIT_ENABLED:
+        limiter.hit(user_id, cost)
+
+
+def rate_limit(limiter: TokenBucketLimiter):
+    """Route dependency charging one token to the current user's bucket."""
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> None:
+        charge(limiter, current_user.id)
+    return dependency
@@ -0,0 +1,122 @@
+# backend/app/services/analysis.py
+"""
+Background mood analysis for many entries at once.
+
+Used by routes that write entries in bulk: the entries are committed first,
+then analysed here in fixed-size batches (one DeepL + one HF call per model
+per batch) and their mood_analysis rows upserted with multi-row inserts.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Iterable, List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+from app.services import nlp, sync
+from app.services.admission import inference_gate
+from app.services.journal_cache import after_write
+
+logger = logging.getLogger(__name__)
+
+
+def _batches(ids: List[uuid.UUID], size: int) -> Iterable[List[uuid.UUID]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+async def analyze_entries(user_id: uuid.UUID, entry_ids: List[uuid.UUID]) -> None:
+    """
+    (Re-)analyse `entry_ids` of one user and replace their mood_analysis rows.
+    Runs outside the request, with its own sessions; no transaction is kept
+    open while the models are being called.
+    """
+    try:
+        for batch in _batches(entry_ids, settings.ANALYSIS_BATCH_SIZE):
+            async with SessionLocal() as db:
+                rows = (await db.execute(
+                    select(
+                        models.JournalEntry.id,
+                        models.JournalEntry.content,
+                        models.JournalEntry.created_at,
+                        models.JournalEntry.updated_at,
+                    ).where(
+                        models.JournalEntry.id.in_(batch),
+                        models.JournalEntry.user_id == user_id,
+                    )
+                )).all()
+            if not rows:
+                continue
+
+            try:
+                # no timeout: background batches wait for a slot instead of failing
+                async with inference_gate.slot():
+                    analyses = await run_in_threadpool(
+                        nlp.analyze_mood_batch, [r.content for r in rows]
+                    )
+            except Exception:
+                logger.exception("Batch analysis failed for %d entries", len(rows))
+                analyses = [dict(nlp.DEFAULT_ANALYSIS) for _ in rows]
+
+            async with SessionLocal() as db:
+                # the change_seq bump below is ordered with the user's other writes
+                await sync.lock_changes(db, user_id)
+                # lock the entries and keep only those still holding the analysed
+                # text: an edit since the read has (or will get) its own analysis
+                current = dict((await db.execute(
+                    select(models.JournalEntry.id, models.JournalEntry.updated_at)
+                    .where(
+                        models.JournalEntry.id.in_([r.id for r in rows]),
+                        models.JournalEntry.user_id == user_id,
+                    )
+                    .with_for_update()
+                )).all())
+                fresh = [
+                    (r, a) for r, a in zip(rows, analyses)
+                    if r.id in current and current[r.id] == r.updated_at
+                ]
+                if not fresh:
+                    continue
+                ids = [r.id for r, _ in fresh]
+                now = datetime.utcnow()
+                stmt = pg_insert(models.MoodAnalysis).values([
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "entry_id": r.id,
+                        "entry_created_at": r.created_at,
+                        "sentiment": a.get("sentiment", "unknown"),
+                        "emotion": a.get("emotion", "unknown"),
+                        "score": a.get("score", 0.0),
+                        "created_at": now,
+                    }
+                    for r, a in fresh
+                ])
+                await db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["entry_id", "entry_created_at"],
+                        set_={
+                            "sentiment": stmt.excluded.sentiment,
+                            "emotion": stmt.excluded.emotion,
+                            "score": stmt.excluded.score,
+                            "created_at": stmt.excluded.created_at,
+                        },
+                    )
+                )
+                await db.execute(
+                    update(models.JournalEntry)
+                    .where(models.JournalEntry.id.in_(ids))
+                    .values(change_seq=models.journal_change_seq.next_value())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            after_write(user_id)
+    except Exception:
+        logger.exception("Background analysis aborted for user %s", user_id)
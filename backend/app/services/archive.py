@@ -0,0 +1,451 @@
+# backend/app/services/archive.py
+"""
+Cold archive for old journal entries.
+
+Entries (with their mood analysis) older than ARCHIVE_AFTER_DAYS are moved,
+one (user, month) at a time, into a zstd-compressed Parquet segment under
+ARCHIVE_DIR and removed from journal_entries. journal_archive_segments is the
+manifest: one row per segment, with enough metadata (time range, max
+change_seq) to skip segments a read does not need.
+
+Segment files are immutable; re-archiving a month (e.g. after an import of
+old entries) writes a new file that merges the old one, swaps the manifest
+row and only then deletes the previous file. Editing or deleting an archived
+entry first restores its whole month into the hot tables.
+"""
+from __future__ import annotations
+
+import functools
+import heapq
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import any_, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+from app.services.journal_cache import after_write
+from app.services.partitions import add_months, ensure_partitions, month_start
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _segment_schema():
+    # pyarrow is imported on first use: most workers never touch a segment
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.string()),
+        ("content", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+        ("change_seq", pa.int64()),
+        ("mood_id", pa.string()),
+        ("sentiment", pa.string()),
+        ("emotion", pa.string()),
+        ("score", pa.float64()),
+        ("analyzed_at", pa.timestamp("us")),
+    ])
+
+
+# ----------------- SEGMENT FILES -----------------
+def _abs_path(rel_path: str) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, rel_path)
+
+
+def _write_segment(rows: List[Dict], rel_path: str) -> int:
+    """Write rows to a new segment file atomically; return its size in bytes."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = _abs_path(rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    table = pa.Table.from_pylist(
+        [{**r, "id": str(r["id"]), "mood_id": r["mood_id"] and str(r["mood_id"])} for r in rows],
+        schema=_segment_schema(),
+    )
+    pq.write_table(table, tmp, compression=settings.ARCHIVE_COMPRESSION)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def _read_segment(rel_path: str, columns: Optional[List[str]] = None) -> List[Dict]:
+    import pyarrow.parquet as pq
+
+    rows = pq.read_table(_abs_path(rel_path), columns=columns).to_pylist()
+    for r in rows:
+        if "id" in r:
+            r["id"] = uuid.UUID(r["id"])
+        if r.get("mood_id"):
+            r["mood_id"] = uuid.UUID(r["mood_id"])
+    metrics.inc("archive_segment_reads_total")
+    return rows
+
+
+def _remove_segment(rel_path: str) -> None:
+    try:
+        os.remove(_abs_path(rel_path))
+    except FileNotFoundError:
+        pass
+
+
+# ----------------- READS -----------------
+# with ARCHIVE_ENABLED off no segment is ever written, so once a worker has seen
+# an empty manifest it can skip the manifest query on every read
+_segments_possible: Optional[bool] = None
+
+
+async def _archive_in_use(db: AsyncSession) -> bool:
+    global _segments_possible
+    if settings.ARCHIVE_ENABLED:
+        return True
+    if _segments_possible is None:
+        # segments left from when archiving was on are still served
+        _segments_possible = await db.scalar(
+            select(literal(True)).select_from(models.JournalArchiveSegment).limit(1)
+        ) is not None
+    return _segments_possible
+
+
+async def list_segments(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_change_seq: Optional[int] = None,
+    max_change_seq: Optional[int] = None,
+) -> List[models.JournalArchiveSegment]:
+    """Manifest rows of one user that may hold rows in the given bounds, oldest first."""
+    if not await _archive_in_use(db):
+        return []
+    stmt = select(models.JournalArchiveSegment).where(
+        models.JournalArchiveSegment.user_id == user_id
+    )
+    if start is not None:
+        stmt = stmt.where(models.JournalArchiveSegment.max_created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.JournalArchiveSegment.min_created_at < end)
+    if min_change_seq is not None:
+        stmt = stmt.where(models.JournalArchiveSegment.max_change_seq > min_change_seq)
+    if max_change_seq is not None:
+        # segments written before min_change_seq was recorded can't be skipped
+        stmt = stmt.where(
+            models.JournalArchiveSegment.min_change_seq.is_(None)
+            | (models.JournalArchiveSegment.min_change_seq <= max_change_seq)
+        )
+    return list((await db.scalars(stmt.order_by(models.JournalArchiveSegment.month))).all())
+
+
+async def iter_segment_rows(segments: Iterable[models.JournalArchiveSegment]) -> AsyncIterator[Dict]:
+    """Rows of `segments` in created_at order, one file in memory at a time."""
+    for segment in segments:
+        for row in await run_in_threadpool(_read_segment, segment.path):
+            yield row
+
+
+def to_entry(row: Dict) -> models.JournalEntry:
+    """Transient (never added to a session) entry + analysis for serialization."""
+    entry = models.JournalEntry(
+        id=row["id"],
+        content=row["content"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        change_seq=row["change_seq"],
+    )
+    if row["mood_id"] is not None:
+        entry.mood_analysis = models.MoodAnalysis(
+            id=row["mood_id"],
+            sentiment=row["sentiment"],
+            emotion=row["emotion"],
+            score=row["score"],
+            created_at=row["analyzed_at"],
+        )
+    return entry
+
+
+async def read_entries(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_change_seq: Optional[int] = None,
+    max_change_seq: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[models.JournalEntry]:
+    """
+    Archived entries of one user within the bounds, as transient JournalEntry
+    objects. With `limit`, only the `limit` lowest change_seqs (sync pages).
+    """
+    segments = await list_segments(db, user_id, start, end, min_change_seq, max_change_seq)
+    rows = []
+    async for row in iter_segment_rows(segments):
+        if start is not None and row["created_at"] < start:
+            continue
+        if end is not None and row["created_at"] >= end:
+            continue
+        if min_change_seq is not None and row["change_seq"] <= min_change_seq:
+            continue
+        if max_change_seq is not None and row["change_seq"] > max_change_seq:
+            continue
+        rows.append(row)
+    if limit is not None:
+        rows = heapq.nsmallest(limit, rows, key=lambda r: r["change_seq"])
+    return [to_entry(r) for r in rows]
+
+
+async def find_entry(
+    db: AsyncSession, user_id: uuid.UUID, entry_id: uuid.UUID
+) -> Optional[models.JournalEntry]:
+    """One archived entry by id (newest segments first), or None."""
+    for segment in reversed(await list_segments(db, user_id)):
+        ids = await run_in_threadpool(_read_segment, segment.path, ["id"])
+        if any(r["id"] == entry_id for r in ids):
+            rows = await run_in_threadpool(_read_segment, segment.path)
+            return next(to_entry(r) for r in rows if r["id"] == entry_id)
+    return None
+
+
+# ----------------- ARCHIVAL JOB -----------------
+def _hot_rows_stmt(user_id: uuid.UUID, start: datetime, end: datetime):
+    return (
+        select(
+            models.JournalEntry.id,
+            models.JournalEntry.content,
+            models.JournalEntry.created_at,
+            models.JournalEntry.updated_at,
+            models.JournalEntry.change_seq,
+            models.MoodAnalysis.id.label("mood_id"),
+            models.MoodAnalysis.sentiment,
+            models.MoodAnalysis.emotion,
+            models.MoodAnalysis.score,
+            models.MoodAnalysis.created_at.label("analyzed_at"),
+        )
+        .outerjoin(
+            models.MoodAnalysis,
+            (models.MoodAnalysis.entry_id == models.JournalEntry.id)
+            & (models.MoodAnalysis.entry_created_at == models.JournalEntry.created_at),
+        )
+        .where(
+            models.JournalEntry.user_id == user_id,
+            models.JournalEntry.created_at >= start,
+            models.JournalEntry.created_at < end,
+        )
+        .order_by(models.JournalEntry.created_at)
+    )
+
+
+async def archive_month(user_id: uuid.UUID, month: date) -> int:
+    """Move one user's entries of `month` into its segment; return rows moved."""
+    start = datetime(month.year, month.month, 1)
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    new_path = f"{user_id}/{month:%Y-%m}.{uuid.uuid4().hex[:8]}.parquet"
+    old_path = None
+
+    async with SessionLocal() as db:
+        segment = await db.scalar(
+            select(models.JournalArchiveSegment)
+            .where(
+                models.JournalArchiveSegment.user_id == user_id,
+                models.JournalArchiveSegment.month == month,
+            )
+            .with_for_update()
+        )
+        # lock the rows so a concurrent edit can't be lost between copy and delete
+        rows = [
+            dict(r._mapping)
+            for r in (await db.execute(
+                _hot_rows_stmt(user_id, start, end).with_for_update(of=models.JournalEntry)
+            )).all()
+        ]
+        if not rows:
+            return 0
+        moved_ids = [r["id"] for r in rows]
+
+        if segment is not None:
+            old_path = segment.path
+            archived = await run_in_threadpool(_read_segment, old_path)
+            moved = set(moved_ids)
+            rows = sorted(
+                [r for r in archived if r["id"] not in moved] + rows,
+                key=lambda r: r["created_at"],
+            )
+
+        size = await run_in_threadpool(_write_segment, rows, new_path)
+        try:
+            values = {
+                "path": new_path,
+                "row_count": len(rows),
+                "size_bytes": size,
+                "min_created_at": rows[0]["created_at"],
+                "max_created_at": rows[-1]["created_at"],
+                "min_change_seq": min(r["change_seq"] for r in rows),
+                "max_change_seq": max(r["change_seq"] for r in rows),
+                "created_at": datetime.utcnow(),
+            }
+            stmt = pg_insert(models.JournalArchiveSegment).values(
+                id=uuid.uuid4(), user_id=user_id, month=month, **values
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                constraint="uq_journal_archive_segments_user_id_month", set_=values
+            ))
+            # mood_analysis rows go with them (ON DELETE CASCADE)
+            await db.execute(
+                delete(models.JournalEntry)
+                .where(
+                    models.JournalEntry.user_id == user_id,
+                    models.JournalEntry.created_at >= start,
+                    models.JournalEntry.created_at < end,
+                    models.JournalEntry.id == any_(
+                        literal(moved_ids, ARRAY(UUID(as_uuid=True)))
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            _remove_segment(new_path)
+            raise
+
+    if old_path is not None:
+        _remove_segment(old_path)
+    after_write(user_id)
+    metrics.inc("archive_segments_written_total")
+    metrics.inc("archive_rows_archived_total", len(moved_ids))
+    metrics.observe("archive_segment_bytes", size)
+    return len(moved_ids)
+
+
+async def archive_cold_entries() -> int:
+    """Archive every (user, month) older than ARCHIVE_AFTER_DAYS, a bounded number per run."""
+    cutoff = month_start(datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS))
+    month_col = func.date_trunc("month", models.JournalEntry.created_at)
+    async with SessionLocal() as db:
+        groups = (await db.execute(
+            select(models.JournalEntry.user_id, month_col.label("month"))
+            .where(models.JournalEntry.created_at < cutoff)
+            .group_by(models.JournalEntry.user_id, month_col)
+            .limit(settings.ARCHIVE_SEGMENTS_PER_RUN)
+        )).all()
+
+    total = 0
+    for g in groups:
+        try:
+            total += await archive_month(g.user_id, g.month.date())
+        except Exception:
+            logger.exception("Archiving %s for user %s failed", g.month.strftime("%Y-%m"), g.user_id)
+    if total:
+        logger.info("Archived %d journal entries into %d segments", total, len(groups))
+    return total
+
+
+# ----------------- RESTORE -----------------
+async def restore_month(user_id: uuid.UUID, month: date) -> bool:
+    """Move a segment back into the hot tables and drop it from the manifest."""
+    async with SessionLocal() as db:
+        segment = await db.scalar(
+            select(models.JournalArchiveSegment)
+            .where(
+                models.JournalArchiveSegment.user_id == user_id,
+                models.JournalArchiveSegment.month == month,
+            )
+            .with_for_update()
+        )
+        if segment is None:
+            return False
+        rows = await run_in_threadpool(_read_segment, segment.path)
+        # the month may have been detached (and its tables left in place) since archiving
+        await ensure_partitions([month], recheck=True)
+
+        await db.execute(
+            pg_insert(models.JournalEntry).on_conflict_do_nothing(),
+            [
+                {
+                    "id": r["id"],
+                    "user_id": user_id,
+                    "content": r["content"],
+                    "created_at": r["created_at"],
+                    "updated_at": r["updated_at"],
+                    "change_seq": r["change_seq"],
+                }
+                for r in rows
+            ],
+        )
+        moods = [
+            {
+                "id": r["mood_id"],
+                "user_id": user_id,
+                "entry_id": r["id"],
+                "entry_created_at": r["created_at"],
+                "sentiment": r["sentiment"],
+                "emotion": r["emotion"],
+                "score": r["score"],
+                "created_at": r["analyzed_at"],
+            }
+            for r in rows
+            if r["mood_id"] is not None
+        ]
+        if moods:
+            await db.execute(pg_insert(models.MoodAnalysis).on_conflict_do_nothing(), moods)
+        path = segment.path
+        await db.delete(segment)
+        await db.commit()
+
+    _remove_segment(path)
+    after_write(user_id)
+    metrics.inc("archive_restores_total")
+    return True
+
+
+async def restore_entry(user_id: uuid.UUID, entry_id: uuid.UUID) -> bool:
+    """Restore the month holding `entry_id`, if it is archived. Newest segments first."""
+    return bool(await restore_entries(user_id, [entry_id]))
+
+
+async def restore_entries(user_id: uuid.UUID, entry_ids: Iterable[uuid.UUID]) -> Set[uuid.UUID]:
+    """
+    Restore every month holding one of `entry_ids`, reading each segment's id
+    column once however many ids are asked for. Returns the ids restored.
+    """
+    wanted = set(entry_ids)
+    restored: Set[uuid.UUID] = set()
+    async with SessionLocal() as db:
+        segments = await list_segments(db, user_id)
+    for segment in reversed(segments):
+        if not wanted:
+            break
+        ids = await run_in_threadpool(_read_segment, segment.path, ["id"])
+        found = wanted.intersection(r["id"] for r in ids)
+        if found and await restore_month(user_id, segment.month):
+            restored |= found
+            wanted -= found
+    return restored
+
+
+# ----------------- DELETE -----------------
+async def delete_segments(db: AsyncSession, user_id: uuid.UUID, limit: int) -> int:
+    """
+    Remove up to `limit` of the user's segments: files first, then manifest
+    rows in the caller's transaction (caller commits). If the commit never
+    happens the rows point at missing files and the next run finishes them.
+    """
+    segments = (await db.scalars(
+        select(models.JournalArchiveSegment)
+        .where(models.JournalArchiveSegment.user_id == user_id)
+        .limit(limit)
+        .with_for_update()
+    )).all()
+    for segment in segments:
+        await run_in_threadpool(_remove_segment, segment.path)
+        await db.delete(segment)
+    return len(segments)
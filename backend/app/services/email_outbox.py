@@ -0,0 +1,248 @@
+# backend/app/services/email_outbox.py
+"""
+Transactional email outbox.
+
+Routes call `enqueue(db, ...)` inside their own transaction and return once
+it commits; the row is the promise that the mail goes out. A worker per app
+process claims due rows in batches (FOR UPDATE SKIP LOCKED, so workers never
+pick the same row), sends them over a small pool of reused SMTP connections
+and records the outcome. Failures are retried with exponential backoff;
+permanent SMTP rejections (5xx) and rows out of attempts end as "failed".
+
+A claim is a lease: it pushes next_attempt_at forward by
+EMAIL_SEND_LEASE_SECONDS, so rows held by a crashed worker come back on
+their own. Delivery is therefore at-least-once.
+
+For local testing point MAIL_SERVER/MAIL_PORT at a sink, e.g.
+`python -m aiosmtpd -n -l localhost:8025` with MAIL_TLS=false and
+MAIL_USE_CREDENTIALS=false.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import AsyncIterator, List
+
+import aiosmtplib
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+_wakeup = asyncio.Event()
+
+
+def enqueue(db: AsyncSession, recipient: str, subject: str, body: str, subtype: str = "plain") -> None:
+    """Add an email to the caller's transaction; call `notify()` after the commit."""
+    db.add(EmailOutbox(recipient=recipient, subject=subject, body=body, subtype=subtype))
+
+
+def notify() -> None:
+    """Wake this process's worker now instead of at its next poll."""
+    _wakeup.set()
+
+
+# ----------------- SMTP CONNECTION POOL -----------------
+class SMTPPool:
+    """At most `size` open connections, reused across messages and batches."""
+
+    def __init__(self, size: int, idle_seconds: float):
+        self._sem = asyncio.Semaphore(size)
+        self._idle: List[tuple] = []  # (client, last_used)
+        self._idle_seconds = idle_seconds
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        credentials = settings.MAIL_USE_CREDENTIALS
+        client = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME if credentials else None,
+            password=settings.MAIL_PASSWORD if credentials else None,
+            use_tls=settings.MAIL_SSL,
+            start_tls=settings.MAIL_TLS and not settings.MAIL_SSL,
+            timeout=settings.EMAIL_SMTP_TIMEOUT_SECONDS,
+        )
+        await client.connect()
+        metrics.inc("smtp_connections_opened_total")
+        return client
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        async with self._sem:
+            client = None
+            now = time.monotonic()
+            while self._idle and client is None:
+                candidate, last_used = self._idle.pop()
+                if candidate.is_connected and now - last_used < self._idle_seconds:
+                    client = candidate
+                else:
+                    await _close(candidate)
+            if client is None:
+                client = await self._connect()
+            try:
+                yield client
+            except BaseException:
+                # the session may be mid-command; never hand it out again
+                await _close(client)
+                raise
+            self._idle.append((client, time.monotonic()))
+
+    async def close_idle(self, max_idle: float = 0) -> None:
+        now = time.monotonic()
+        keep = []
+        for client, last_used in self._idle:
+            if now - last_used >= max_idle:
+                await _close(client)
+            else:
+                keep.append((client, last_used))
+        self._idle = keep
+
+
+async def _close(client: aiosmtplib.SMTP) -> None:
+    try:
+        if client.is_connected:
+            await client.quit()
+    except Exception:
+        client.close()
+
+
+smtp_pool = SMTPPool(settings.EMAIL_SMTP_POOL_SIZE, settings.EMAIL_SMTP_IDLE_SECONDS)
+
+
+# ----------------- WORKER -----------------
+def _message(row) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    msg["To"] = row.recipient
+    msg["Subject"] = row.subject
+    msg.set_content(row.body, subtype=row.subtype)
+    return msg
+
+
+def _is_permanent(exc: Exception) -> bool:
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= e.code < 600 for e in exc.recipients)
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and 500 <= exc.code < 600
+
+
+async def _claim(db: AsyncSession, limit: int):
+    now = datetime.utcnow()
+    due = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = (await db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due))
+        .values(
+            attempts=EmailOutbox.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS),
+        )
+        .returning(
+            EmailOutbox.id, EmailOutbox.recipient, EmailOutbox.subject, EmailOutbox.body,
+            EmailOutbox.subtype, EmailOutbox.attempts, EmailOutbox.created_at,
+        )
+    )).all()
+    await db.commit()
+    return rows
+
+
+async def _send(row):
+    """Send one claimed row; returns None on success or the exception."""
+    t0 = time.perf_counter()
+    try:
+        async with smtp_pool.connection() as client:
+            await client.send_message(_message(row))
+    except Exception as exc:
+        return exc
+    finally:
+        metrics.observe("email_send_seconds", time.perf_counter() - t0)
+    metrics.observe("email_outbox_lag_seconds", (datetime.utcnow() - row.created_at).total_seconds())
+    return None
+
+
+async def process_batch() -> int:
+    """Claim and send one batch of due emails; returns how many were claimed."""
+    async with SessionLocal() as db:
+        rows = await _claim(db, settings.EMAIL_OUTBOX_BATCH_SIZE)
+        if not rows:
+            return 0
+        metrics.observe("email_outbox_batch_size", len(rows))
+
+        # the semaphore inside the pool bounds concurrency to its size
+        results = await asyncio.gather(*(_send(row) for row in rows))
+
+        now = datetime.utcnow()
+        sent_ids = [row.id for row, exc in zip(rows, results) if exc is None]
+        if sent_ids:
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent_ids))
+                .values(status="sent", sent_at=now, last_error=None)
+            )
+            metrics.inc("email_outbox_sent_total", len(sent_ids))
+
+        for row, exc in zip(rows, results):
+            if exc is None:
+                continue
+            if _is_permanent(exc) or row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                values = {"status": "failed"}
+                reason = "permanent" if _is_permanent(exc) else "exhausted"
+            else:
+                backoff = min(
+                    settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (row.attempts - 1),
+                    settings.EMAIL_RETRY_MAX_SECONDS,
+                )
+                values = {"next_attempt_at": now + timedelta(seconds=backoff)}
+                reason = "retry"
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == row.id)
+                .values(last_error=repr(exc)[:1000], **values)
+            )
+            metrics.inc("email_outbox_failures_total", reason=reason)
+            logger.warning("Email %s to %s failed (%s): %r", row.id, row.recipient, reason, exc)
+        await db.commit()
+    return len(rows)
+
+
+async def run_worker() -> None:
+    """Drain the outbox until cancelled; sleeps between polls unless notified."""
+    while True:
+        claimed = 0
+        try:
+            claimed = await process_batch()
+        except Exception:
+            logger.exception("Email outbox batch failed")
+        if claimed >= settings.EMAIL_OUTBOX_BATCH_SIZE:
+            continue  # more may be due right away
+        try:
+            await asyncio.wait_for(_wakeup.wait(), settings.EMAIL_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            await smtp_pool.close_idle(settings.EMAIL_SMTP_IDLE_SECONDS)
+        _wakeup.clear()
+
+
+async def purge_old() -> int:
+    """Delete sent and failed rows past EMAIL_OUTBOX_RETENTION_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    async with SessionLocal() as db:
+        result = await db.execute(
+            delete(EmailOutbox).where(
+                EmailOutbox.status.in_(("sent", "failed")), EmailOutbox.created_at < cutoff
+            )
+        )
+        await db.commit()
+    return result.rowcount
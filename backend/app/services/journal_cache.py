@@ -0,0 +1,25 @@
+# backend/app/services/journal_cache.py
+"""Per-worker cache of journal list responses and the write hook that keeps it fresh."""
+import uuid
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import replicas
+
+
+# Cached GET /journals/ response bodies (encoded JSON bytes), keyed by
+# (user_id, *query params); the budget counts the exact body size.
+entries_cache = TTLCache(
+    name="journal_entries",
+    max_entries=settings.JOURNAL_CACHE_MAX_ENTRIES,
+    max_bytes=settings.JOURNAL_CACHE_MAX_BYTES,
+    ttl_seconds=settings.JOURNAL_CACHE_TTL_SECONDS,
+    sizeof=len,
+    enabled=settings.JOURNAL_CACHE_ENABLED,
+)
+
+
+def after_write(user_id: uuid.UUID) -> None:
+    """Drop the user's cached reads and pin their reads to the primary for a bit."""
+    entries_cache.invalidate(user_id)
+    replicas.mark_write(user_id)
@@ -0,0 +1,123 @@
+# backend/app/services/maintenance.py
+"""
+Housekeeping jobs run by the scheduler (see app/main.py for the schedule).
+
+Each job works in batches of MAINTENANCE_BATCH_SIZE rows, committing after
+every batch so no lock is held for long, and returns how many rows it
+touched.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import and_, delete, exists, select
+
+from app.auth.principal import invalidate_principal, principals_cache, tokens_cache
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+from app.services.analysis import analyze_entries
+from app.services.journal_cache import entries_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_unverified_users() -> int:
+    """Delete accounts that never verified and whose OTP expired a grace period ago."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.UNVERIFIED_USER_GRACE_HOURS)
+    User = models.User
+    total = 0
+    async with SessionLocal() as db:
+        while True:
+            batch = (
+                select(User.id)
+                .where(
+                    User.is_verified.is_not(True),
+                    User.otp_expiry < cutoff,
+                    # never verified means never logged in, but don't bet data on it
+                    ~exists().where(models.JournalEntry.user_id == User.id),
+                    ~exists().where(models.MoodAnalysis.user_id == User.id),
+                )
+                .limit(settings.MAINTENANCE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            deleted = (await db.execute(
+                delete(User).where(User.id.in_(batch)).returning(User.id)
+            )).scalars().all()
+            await db.commit()
+            for user_id in deleted:
+                invalidate_principal(user_id)
+            total += len(deleted)
+            if len(deleted) < settings.MAINTENANCE_BATCH_SIZE:
+                break
+    if total:
+        logger.info("Purged %d unverified users", total)
+    return total
+
+
+async def delete_orphan_moods() -> int:
+    """Delete mood_analysis rows that lost their entry (entry_id IS NULL)."""
+    Mood = models.MoodAnalysis
+    total = 0
+    async with SessionLocal() as db:
+        while True:
+            # NULLs are in the (entry_id, entry_created_at) unique index
+            batch = (
+                select(Mood.id)
+                .where(Mood.entry_id.is_(None))
+                .limit(settings.MAINTENANCE_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            deleted = (await db.execute(
+                delete(Mood).where(Mood.entry_id.is_(None), Mood.id.in_(batch))
+            )).rowcount
+            await db.commit()
+            total += deleted
+            if deleted < settings.MAINTENANCE_BATCH_SIZE:
+                break
+    if total:
+        logger.info("Deleted %d orphaned mood analyses", total)
+    return total
+
+
+async def analyze_pending_entries() -> int:
+    """
+    Analyse entries that have no mood_analysis row, e.g. when a background
+    analysis died with its worker. Entries are picked by when they were
+    written (inserted_at, indexed), not by created_at, which an import can
+    back-date by years. Only rows written in the last
+    PENDING_ANALYSIS_LOOKBACK_DAYS are considered; those younger than
+    PENDING_ANALYSIS_MIN_AGE_MINUTES are left to the request that wrote them.
+    """
+    Entry, Mood = models.JournalEntry, models.MoodAnalysis
+    now = datetime.utcnow()
+    since = now - timedelta(days=settings.PENDING_ANALYSIS_LOOKBACK_DAYS)
+    cutoff = now - timedelta(minutes=settings.PENDING_ANALYSIS_MIN_AGE_MINUTES)
+    async with SessionLocal() as db:
+        rows = (await db.execute(
+            select(Entry.user_id, Entry.id)
+            .outerjoin(
+                Mood,
+                and_(Mood.entry_id == Entry.id, Mood.entry_created_at == Entry.created_at),
+            )
+            .where(Mood.id.is_(None), Entry.inserted_at >= since, Entry.inserted_at < cutoff)
+            .limit(settings.PENDING_ANALYSIS_PER_RUN)
+        )).all()
+    by_user: Dict[uuid.UUID, List[uuid.UUID]] = defaultdict(list)
+    for user_id, entry_id in rows:
+        by_user[user_id].append(entry_id)
+    for user_id, entry_ids in by_user.items():
+        await analyze_entries(user_id, entry_ids)
+    if rows:
+        logger.info("Analysed %d pending entries for %d users", len(rows), len(by_user))
+    return len(rows)
+
+
+async def purge_caches() -> int:
+    """Drop expired entries from this worker's in-process caches."""
+    return sum(
+        cache.purge_expired() for cache in (entries_cache, tokens_cache, principals_cache)
+    )
@@ -1,14 +1,19 @@
 # backend/app/services/nlp.py
 from __future__ import annotations
+import threading
 import time
 import logging
-from typing import Dict, Any, Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
 from urllib.parse import urljoin
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.log import Redacted
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +42,39 @@ TRANSLATE_API_URL = getattr(
 )
 TRANSLATE_TIMEOUT = getattr(settings, "TRANSLATE_TIMEOUT", 15)  # seconds
 
+# one keep-alive session for HF and DeepL, created on first use; inference
+# runs in threadpool threads, hence the lock
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_maxsize=settings.NLP_HTTP_POOL_SIZE))
+                _session = session
+    return _session
+
+
+def warm_up() -> None:
+    """
+    Startup warm-up, run in a thread after the app is serving: creates the
+    HTTP session and, with NLP_WARMUP_MODELS, sends one tiny input to each
+    HF model so a cold model starts loading before the first real entry.
+    """
+    http_session()
+    if not (settings.NLP_WARMUP_MODELS and HF_API_TOKEN):
+        return
+    for model in (SENTIMENT_MODEL, EMOTION_MODEL):
+        try:
+            _call_hf_model(model, "hello", retries=1, timeout=30)
+        except Exception as exc:
+            logger.warning("Warm-up call to %s failed: %s", model, exc)
+
+
 # safe defaults
 DEFAULT_ANALYSIS = {
     "sentiment": "unknown",
@@ -48,9 +86,25 @@ DEFAULT_ANALYSIS = {
 }
 
 
+@contextmanager
+def _track(api: str, model: str, batch: bool = False) -> Iterator[None]:
+    """Latency (retries included) and errors of one API call, by model."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        metrics.inc("nlp_errors_total", api=api, model=model, error=type(exc).__name__)
+        raise
+    finally:
+        metrics.observe(
+            "nlp_request_seconds", time.perf_counter() - t0,
+            api=api, model=model, batch=str(batch).lower(),
+        )
+
+
 def _call_hf_model(
     model_name: str,
-    text: str,
+    text: str | List[str],
     top_k: Optional[int] = None,
     retries: int = 3,
     timeout: int = 120,
@@ -59,6 +113,7 @@ def _call_hf_model(
 ) -> Any:
     """
     Call Hugging Face Inference API with retries and model-loading handling.
+    `text` may be a list of inputs; the API then returns one result per input.
     """
     if not HF_API_TOKEN:
         raise RuntimeError("HF_API_TOKEN is not set. Set it in your .env or settings.")
@@ -70,38 +125,42 @@ def _call_hf_model(
     if parameters:
         payload["parameters"] = {**payload.get("parameters", {}), **parameters}
 
-    for attempt in range(1, retries + 1):
-        try:
-            resp = requests.post(url, headers=HEADERS, json=payload, timeout=timeout)
-        except requests.RequestException as exc:
-            logger.warning("HF request exception (attempt %d/%d): %s", attempt, retries, exc)
-            if attempt < retries:
-                time.sleep(backoff_factor * attempt)
-                continue
-            raise
-
-        try:
-            data = resp.json()
-        except ValueError:
-            resp.raise_for_status()
-
-        if resp.status_code == 200:
-            if isinstance(data, dict) and data.get("error"):
-                err = data.get("error", "")
-                if "loading" in err.lower() and attempt < retries:
+    with _track("hf", model_name, batch=isinstance(text, list)):
+        for attempt in range(1, retries + 1):
+            try:
+                resp = http_session().post(url, headers=HEADERS, json=payload, timeout=timeout)
+            except requests.RequestException as exc:
+                logger.warning("HF request exception (attempt %d/%d): %s", attempt, retries, exc)
+                if attempt < retries:
+                    metrics.inc("nlp_retries_total", api="hf", model=model_name, reason="request_error")
                     time.sleep(backoff_factor * attempt)
                     continue
-                raise RuntimeError(f"HuggingFace error: {err}")
-            return data
-        elif resp.status_code in (502, 503, 504):
-            if attempt < retries:
-                time.sleep(backoff_factor * attempt)
-                continue
-            resp.raise_for_status()
-        else:
-            resp.raise_for_status()
+                raise
+
+            try:
+                data = resp.json()
+            except ValueError:
+                resp.raise_for_status()
+
+            if resp.status_code == 200:
+                if isinstance(data, dict) and data.get("error"):
+                    err = data.get("error", "")
+                    if "loading" in err.lower() and attempt < retries:
+                        metrics.inc("nlp_retries_total", api="hf", model=model_name, reason="model_loading")
+                        time.sleep(backoff_factor * attempt)
+                        continue
+                    raise RuntimeError(f"HuggingFace error: {err}")
+                return data
+            elif resp.status_code in (502, 503, 504):
+                if attempt < retries:
+                    metrics.inc("nlp_retries_total", api="hf", model=model_name, reason=str(resp.status_code))
+                    time.sleep(backoff_factor * attempt)
+                    continue
+                resp.raise_for_status()
+            else:
+                resp.raise_for_status()
 
-    raise RuntimeError("HF Inference: max retries exceeded")
+        raise RuntimeError("HF Inference: max retries exceeded")
 
 
 def _extract_top(result: Any) -> Dict[str, Any]:
@@ -134,7 +193,7 @@ def translate_text_to_english(text: str) -> Tuple[str, str]:
         logger.warning("TRANSLATE_API_KEY not set — skipping translation.")
         return text, "unknown"
 
-    logger.info(f"[DeepL] Sending text for translation: {text[:80]}...")
+    logger.debug("[DeepL] Translating %s", Redacted(text))
 
     url = TRANSLATE_API_URL
     payload = {
@@ -143,30 +202,67 @@ def translate_text_to_english(text: str) -> Tuple[str, str]:
         "target_lang": "EN",
     }
     try:
-        resp = requests.post(url, data=payload, timeout=TRANSLATE_TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
+        with _track("deepl", "translate"):
+            resp = http_session().post(url, data=payload, timeout=TRANSLATE_TIMEOUT)
+            resp.raise_for_status()
+            data = resp.json()
 
         translations = data.get("translations", [])
         if translations and isinstance(translations, list):
             first = translations[0]
             translated = first.get("text", "") or ""
             detected = first.get("detected_source_language", "unknown")
-            logger.info(f"[DeepL] Detected language={detected}, Translated text={translated[:80]}...")
+            logger.debug("[DeepL] Detected language=%s, translated=%s", detected, Redacted(translated))
             return translated, (detected or "unknown")
 
-        logger.debug("DeepL returned unexpected shape: %s", data)
+        # keys only: the payload holds the translated journal text
+        logger.debug("DeepL returned unexpected shape: %s", sorted(data) if isinstance(data, dict) else type(data))
         return text, "unknown"
 
     except requests.RequestException as exc:
-        logger.warning(f"[DeepL] Request failed: {exc}")
+        logger.warning("[DeepL] Request failed: %s", exc)
         return text, "unknown"
     except Exception as exc:
-        logger.exception(f"[DeepL] Unexpected error: {exc}")
+        logger.exception("[DeepL] Unexpected error: %s", exc)
         return text, "unknown"
 
 
 
+# DeepL accepts up to 50 `text` params per request
+DEEPL_MAX_TEXTS = 50
+
+
+def translate_texts_to_english(texts: List[str]) -> List[Tuple[str, str]]:
+    """
+    Batch variant of `translate_text_to_english`: one DeepL request per
+    DEEPL_MAX_TEXTS texts. Falls back to (original_text, "unknown") per item.
+    """
+    if not TRANSLATE_API_KEY:
+        return [(t, "unknown") for t in texts]
+
+    out: List[Tuple[str, str]] = []
+    for start in range(0, len(texts), DEEPL_MAX_TEXTS):
+        chunk = texts[start:start + DEEPL_MAX_TEXTS]
+        payload = [("auth_key", TRANSLATE_API_KEY), ("target_lang", "EN")]
+        payload += [("text", t) for t in chunk]
+        try:
+            with _track("deepl", "translate", batch=True):
+                resp = http_session().post(TRANSLATE_API_URL, data=payload, timeout=TRANSLATE_TIMEOUT)
+                resp.raise_for_status()
+                translations = resp.json().get("translations", [])
+        except Exception as exc:
+            logger.warning("[DeepL] Batch request failed: %s", exc)
+            translations = []
+
+        if len(translations) != len(chunk):
+            out.extend((t, "unknown") for t in chunk)
+            continue
+        for original, tr in zip(chunk, translations):
+            translated = tr.get("text", "") or original
+            out.append((translated, tr.get("detected_source_language") or "unknown"))
+    return out
+
+
 # -------------------------
 # Core sentiment/emotion flow
 # -------------------------
@@ -216,6 +312,56 @@ def get_recommendation(sentiment: str, emotion: str, score: float) -> str:
     return "Keep moving forward — you are doing better than you think."
 
 
+def _build_analysis(
+    sent_raw: Any,
+    emo_raw: Any,
+    translated_text: str,
+    detected_lang: str,
+) -> Dict[str, Any]:
+    """Turn raw HF sentiment/emotion outputs for one text into an analysis dict."""
+    s = _extract_top(sent_raw)
+    e = _extract_top(emo_raw) if emo_raw is not None else {"label": "unknown", "score": 0.0}
+
+    sent_label = (s.get("label") or "").strip().lower()
+    if "pos" in sent_label or "positive" in sent_label:
+        sentiment = "positive"
+    elif "neg" in sent_label or "negative" in sent_label:
+        sentiment = "negative"
+    elif sent_label in ("neutral", "none", ""):
+        sentiment = "neutral"
+    else:
+        sentiment = sent_label or "unknown"
+
+    emotion = (e.get("label") or "unknown").strip().lower()
+
+    try:
+        sentiment_score = float(s.get("score", 0.0))
+    except Exception:
+        sentiment_score = 0.0
+    try:
+        emotion_score = float(e.get("score", 0.0))
+    except Exception:
+        emotion_score = 0.0
+
+    if emotion == "unknown":
+        combined_score = sentiment_score
+    else:
+        combined_score = (sentiment_score + emotion_score) / 2.0
+
+    recommendation = get_recommendation(sentiment, emotion, combined_score)
+
+    return {
+        "sentiment": sentiment,
+        "emotion": emotion,
+        "sentiment_score": round(sentiment_score, 4),
+        "emotion_score": round(emotion_score, 4),
+        "score": round(combined_score, 4),
+        "recommendation": recommendation,
+        "translated_text": translated_text,
+        "detected_language": detected_lang,
+    }
+
+
 def analyze_mood(text: str) -> Dict[str, Any]:
     """
     Translate incoming text to English (DeepL) then run HF sentiment + emotion.
@@ -229,7 +375,7 @@ def analyze_mood(text: str) -> Dict[str, Any]:
 
     # Use translated text if available; otherwise fall back to original text
     text_input = (translated_text or text)[:1500]
-    logger.info(f"[Mood Analysis] Using text for HF analysis: {text_input[:80]}...")
+    logger.debug("[Mood Analysis] HF input %s", Redacted(text_input))
 
 
     if not HF_API_TOKEN:
@@ -254,44 +400,53 @@ def analyze_mood(text: str) -> Dict[str, Any]:
         logger.warning("Emotion model call failed: %s", e)
         emo_raw = None
 
-    s = _extract_top(sent_raw)
-    e = _extract_top(emo_raw) if emo_raw is not None else {"label": "unknown", "score": 0.0}
+    return _build_analysis(sent_raw, emo_raw, translated_text, detected_lang)
 
-    sent_label = (s.get("label") or "").strip().lower()
-    if "pos" in sent_label or "positive" in sent_label:
-        sentiment = "positive"
-    elif "neg" in sent_label or "negative" in sent_label:
-        sentiment = "negative"
-    elif sent_label in ("neutral", "none", ""):
-        sentiment = "neutral"
-    else:
-        sentiment = sent_label or "unknown"
 
-    emotion = (e.get("label") or "unknown").strip().lower()
+def analyze_mood_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Batched `analyze_mood`: translates all texts, then sends them to each HF
+    model as a single list input. Returns one analysis dict per text, in order.
+    """
+    if not texts:
+        return []
 
-    try:
-        sentiment_score = float(s.get("score", 0.0))
-    except Exception:
-        sentiment_score = 0.0
-    try:
-        emotion_score = float(e.get("score", 0.0))
-    except Exception:
-        emotion_score = 0.0
+    translations = translate_texts_to_english(texts)
+    inputs = [((tr or text) or " ")[:1500] for text, (tr, _) in zip(texts, translations)]
 
-    if emotion == "unknown":
-        combined_score = sentiment_score
-    else:
-        combined_score = (sentiment_score + emotion_score) / 2.0
+    def _defaults() -> List[Dict[str, Any]]:
+        return [
+            {**DEFAULT_ANALYSIS, "translated_text": tr, "detected_language": lang}
+            for tr, lang in translations
+        ]
 
-    recommendation = get_recommendation(sentiment, emotion, combined_score)
+    if not HF_API_TOKEN:
+        logger.warning("HF_API_TOKEN not set — returning default analysis.")
+        return _defaults()
 
-    return {
-        "sentiment": sentiment,
-        "emotion": emotion,
-        "sentiment_score": round(sentiment_score, 4),
-        "emotion_score": round(emotion_score, 4),
-        "score": round(combined_score, 4),
-        "recommendation": recommendation,
-        "translated_text": translated_text,
-        "detected_language": detected_lang,
-    }
+    try:
+        sent_raw = _call_hf_model(SENTIMENT_MODEL, inputs)
+    except Exception as e:
+        logger.exception("Batch sentiment model call failed: %s", e)
+        return _defaults()
+    if not isinstance(sent_raw, list) or len(sent_raw) != len(inputs):
+        logger.warning("Unexpected batch sentiment response shape; using defaults.")
+        return _defaults()
+
+    try:
+        emo_raw = _call_hf_model(EMOTION_MODEL, inputs, top_k=1)
+        if not isinstance(emo_raw, list) or len(emo_raw) != len(inputs):
+            emo_raw = None
+    except Exception as e:
+        logger.warning("Batch emotion model call failed: %s", e)
+        emo_raw = None
+
+    return [
+        _build_analysis(
+            sent_raw[i],
+            emo_raw[i] if emo_raw is not None else None,
+            translations[i][0],
+            translations[i][1],
+        )
+        for i in range(len(inputs))
+    ]
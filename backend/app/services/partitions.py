@@ -0,0 +1,194 @@
+# backend/app/services/partitions.py
+"""
+Monthly range partitions for journal_entries and mood_analysis.
+
+Both tables are partitioned by the entry's created_at month and always get
+their partitions in pairs, named `<table>_pYYYY_MM`. There is deliberately no
+DEFAULT partition: inserts outside the prepared range fail loudly instead of
+piling up in a catch-all, and DETACH ... CONCURRENTLY is only allowed when no
+default partition exists.
+
+`maintain_partitions()` is a scheduler job run by the leader, once right after
+start and then periodically, to create partitions from PARTITION_MONTHS_BACK
+months ago to PARTITION_MONTHS_AHEAD months in advance and, optionally, detach
+partitions older than PARTITION_DETACH_AFTER_MONTHS. The migrations create the
+initial months. Request handlers never create partitions (the one exception is
+restoring an archived month, which re-attaches or recreates a detached month);
+imports check `attached_months()` and reject rows for months that are missing.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime
+from typing import Iterable, List, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# parent table -> partition key column
+PARTITIONED_TABLES = {
+    "journal_entries": "created_at",
+    "mood_analysis": "entry_created_at",
+}
+
+# months this worker has already created/seen, to skip DDL round-trips
+_known: Set[date] = set()
+
+
+def month_start(value: datetime | date) -> date:
+    return date(value.year, value.month, 1)
+
+
+# last month a partition can start in; its upper bound is MAXVALUE
+LAST_MONTH = date(9999, 12, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    """First day of the month `n` months away, clamped to what `date` can hold."""
+    index = month.year * 12 + month.month - 1 + n
+    index = min(max(index, 12), LAST_MONTH.year * 12 + LAST_MONTH.month - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> date:
+    """Inverse of partition_name()."""
+    year, month = name.rsplit("_p", 1)[1].split("_")
+    return date(int(year), int(month), 1)
+
+
+def _bounds_sql(month: date) -> str:
+    upper = "MAXVALUE" if month >= LAST_MONTH else f"'{add_months(month, 1).isoformat()}'"
+    return f"FOR VALUES FROM ('{month.isoformat()}') TO ({upper})"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} {_bounds_sql(month)}"
+    )
+
+
+async def _is_detached(conn, name: str) -> bool:
+    """True if `name` exists as a table but is not a partition (detached earlier)."""
+    return bool(await conn.scalar(
+        text(
+            "SELECT NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid) "
+            "FROM pg_class c WHERE c.relname = :name AND c.relkind = 'r'"
+        ),
+        {"name": name},
+    ))
+
+
+async def ensure_partitions(values: Iterable[datetime | date], recheck: bool = False) -> None:
+    """
+    Make sure both tables have a partition for every month in `values`,
+    re-attaching tables of a month that detach_partition() left behind.
+    `recheck` ignores this worker's cache of known months, which another
+    worker's detach can make stale.
+    """
+    months = sorted({month_start(v) for v in values} - (set() if recheck else _known))
+    if not months:
+        return
+    async with engine.connect() as conn:
+        for month in months:
+            try:
+                async with conn.begin():
+                    # don't queue behind long transactions holding the parent
+                    await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+                    # journal_entries first: attaching mood_analysis clones its FK to it
+                    for table in PARTITIONED_TABLES:
+                        name = partition_name(table, month)
+                        if await _is_detached(conn, name):
+                            # IF NOT EXISTS would skip it and leave the month unroutable
+                            await conn.execute(text(
+                                f"ALTER TABLE {table} ATTACH PARTITION {name} {_bounds_sql(month)}"
+                            ))
+                        else:
+                            await conn.execute(text(create_partition_sql(table, month)))
+            except DBAPIError as exc:
+                # another worker created it between IF NOT EXISTS and CREATE
+                if "already exists" not in str(exc.orig):
+                    raise
+            _known.add(month)
+            metrics.inc("partitions_created_total")
+
+
+async def _list_partitions(conn, table: str) -> List[str]:
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [r.relname for r in rows]
+
+
+async def attached_months() -> Set[date]:
+    """Months that currently have a journal_entries partition (one catalog query)."""
+    async with engine.connect() as conn:
+        return {partition_month(name) for name in await _list_partitions(conn, "journal_entries")}
+
+
+async def detach_partition(month: date) -> None:
+    """
+    Detach one month from both tables without blocking reads or writes on the
+    parents. The detached tables stay in place for archival or a cheap DROP.
+    mood_analysis goes first because its partition references the entries one.
+    """
+    async with engine.connect() as conn:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("mood_analysis", "journal_entries"):
+            name = partition_name(table, month)
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY"))
+        # the standalone mood table no longer belongs under the parent FK
+        mood = partition_name("mood_analysis", month)
+        fks = await conn.execute(
+            text(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = CAST(:rel AS regclass) AND contype = 'f' "
+                "AND confrelid = CAST('journal_entries' AS regclass)"
+            ),
+            {"rel": mood},
+        )
+        for fk in fks.scalars().all():
+            await conn.execute(text(f'ALTER TABLE {mood} DROP CONSTRAINT "{fk}"'))
+    _known.discard(month)
+    metrics.inc("partitions_detached_total")
+    logger.info("Detached journal partitions for %s", month.strftime("%Y-%m"))
+
+
+async def maintain_partitions() -> None:
+    current = month_start(datetime.utcnow())
+    back = settings.PARTITION_MONTHS_BACK
+    if settings.PARTITION_DETACH_AFTER_MONTHS > 0:
+        # never recreate what the detach below would take away again
+        back = min(back, settings.PARTITION_DETACH_AFTER_MONTHS)
+    # skip the DDL (and its lock on the parents) for months that exist
+    _known.update(await attached_months())
+    await ensure_partitions(
+        add_months(current, n) for n in range(-back, settings.PARTITION_MONTHS_AHEAD + 1)
+    )
+
+    if settings.PARTITION_DETACH_AFTER_MONTHS <= 0:
+        return
+    cutoff = add_months(current, -settings.PARTITION_DETACH_AFTER_MONTHS)
+    async with engine.connect() as conn:
+        attached = await _list_partitions(conn, "journal_entries")
+    for name in attached:
+        month = partition_month(name)
+        if month < cutoff:
+            await detach_partition(month)
@@ -0,0 +1,97 @@
+# backend/app/services/sync.py
+"""
+Delta-sync helpers: opaque change tokens and tombstone compaction.
+
+A token is "<change_seq>.<issued_at_unix>". The seq says what the client has
+already seen; the issue time tells us whether the tombstones it still needs
+might have been compacted away, in which case it must resync from scratch.
+
+change_seq values are taken when a statement runs but become visible at
+commit, so two overlapping writers could commit out of seq order and a
+reader could page past the lower seq before it appears. Every transaction
+that assigns seqs for a user first takes `lock_changes()`, a per-user
+transaction-level advisory lock: one user's seqs then commit in order, and
+any snapshot of that user's rows is a gap-free prefix. (The xmin horizon of
+the snapshot does not help here: seq order and transaction-id order differ.)
+"""
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class TokenExpired(Exception):
+    """The token predates the tombstone retention window."""
+
+
+def encode_token(change_seq: int, issued_at: Optional[int] = None) -> str:
+    """
+    Mid-pagination pages pass the incoming token's `issued_at`: the client has
+    not seen the tombstones after `change_seq` yet, so the retention clock
+    must keep running from its original sync. Only a caught-up client gets now.
+    """
+    return f"{change_seq}.{int(time.time()) if issued_at is None else issued_at}"
+
+
+def decode_token(token: Optional[str]) -> Tuple[int, Optional[int]]:
+    """Return (change_seq, issued_at). Raises ValueError or TokenExpired."""
+    if not token:
+        return 0, None
+    seq_part, _, issued_part = token.partition(".")
+    seq, issued_at = int(seq_part), int(issued_part)
+    retention = settings.TOMBSTONE_RETENTION_DAYS * 86400
+    if issued_at < time.time() - retention:
+        raise TokenExpired()
+    return seq, issued_at
+
+
+# first key of the two-int advisory locks below (a key space apart from the scheduler's)
+CHANGES_LOCK_NAMESPACE = 0x6A63  # "jc"
+
+
+async def lock_changes(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """
+    Serialise `user_id`'s change_seq writers until the current transaction
+    ends. Call it before the first statement that assigns a seq.
+    """
+    key = int.from_bytes(user_id.bytes[:4], "big", signed=True)
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:ns, :key)"),
+        {"ns": CHANGES_LOCK_NAMESPACE, "key": key},
+    )
+
+
+async def compact_tombstones() -> int:
+    """Delete tombstones older than the retention window, in small batches."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    total = 0
+    async with SessionLocal() as db:
+        while True:
+            batch = (
+                select(models.JournalTombstone.entry_id)
+                .where(models.JournalTombstone.deleted_at < cutoff)
+                .limit(settings.MAINTENANCE_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            deleted = (await db.execute(
+                delete(models.JournalTombstone).where(models.JournalTombstone.entry_id.in_(batch))
+            )).rowcount
+            await db.commit()
+            total += deleted
+            if deleted < settings.MAINTENANCE_BATCH_SIZE:
+                break
+    if total:
+        logger.info("Compacted %d journal tombstones", total)
+    return total
@@ -0,0 +1,105 @@
+# backend/scripts/bench_compression.py
+"""
+Bytes on the wire and CPU cost of response compression for journal payloads.
+
+Builds GET /journals/ bodies of a few typical sizes and an NDJSON export
+(streamed in 64 KiB chunks, flushed per chunk like the middleware does)
+from synthetic entries, then compresses each with the encoders and levels
+the CompressionMiddleware can be configured with. No database needed.
+
+    cd backend && python -m scripts.bench_compression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+
+from app.core.compression import _Compressor, brotli
+
+WORDS = (
+    "today work friend family walk coffee tired happy anxious meeting call "
+    "project deadline weekend dinner morning evening sleep run gym book read "
+    "movie rain sun felt really think maybe tomorrow hope worried grateful "
+    "long short day week month trip home office team manager mom dad sister "
+    "brother dog cat park music song talked laughed cried stress calm quiet "
+    "busy lunch breakfast plan finally again still never always almost"
+).split()
+
+SETTINGS = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+if brotli is not None:
+    SETTINGS += [("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+def _entries(n: int, rnd: random.Random) -> list:
+    start = datetime(2024, 1, 1)
+    out = []
+    for i in range(n):
+        words = rnd.choices(WORDS, k=rnd.randint(40, 250))
+        created = start + timedelta(hours=i * 7)
+        out.append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "content": " ".join(words).capitalize() + ".",
+            "created_at": created.isoformat(),
+            "updated_at": None,
+            "mood_analysis": {
+                "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+                "sentiment": rnd.choice(["positive", "negative", "neutral"]),
+                "emotion": rnd.choice(["joy", "sadness", "anger", "fear", "neutral"]),
+                "score": round(rnd.random(), 4),
+                "created_at": created.isoformat(),
+                "recommendation": "Keep writing about what went well today.",
+            },
+        })
+    return out
+
+
+def _export_chunks(entries: list, chunk_size: int = 64 * 1024) -> list:
+    text = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode()
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def _measure(chunks: list, encoding: str, level: int, repeat: int):
+    timings, size = [], 0
+    for _ in range(repeat):
+        comp = _Compressor(encoding, gzip_level=level, brotli_quality=level)
+        t0 = time.process_time()
+        size = sum(
+            len(comp.compress(c, final=(i == len(chunks) - 1))) for i, c in enumerate(chunks)
+        )
+        timings.append(time.process_time() - t0)
+    return size, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rnd = random.Random(args.seed)
+
+    payloads = {
+        f"list {n}": [orjson.dumps({"entries": _entries(n, rnd)})] for n in (20, 200, 2000)
+    }
+    payloads["export 2000 (ndjson)"] = _export_chunks(_entries(2000, rnd))
+
+    for name, chunks in payloads.items():
+        raw = sum(len(c) for c in chunks)
+        print(f"\n{name}: {raw / 1024:.1f} KiB uncompressed")
+        for encoding, level in SETTINGS:
+            size, cpu = _measure(chunks, encoding, level, args.repeat)
+            print(
+                f"  {encoding:<4} level {level:<2}  {size / 1024:8.1f} KiB "
+                f"({size / raw:6.1%})  cpu {cpu * 1000:7.2f} ms  "
+                f"({raw / 1024 / 1024 / max(cpu, 1e-9):6.0f} MiB/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
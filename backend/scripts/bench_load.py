@@ -0,0 +1,77 @@
+# backend/scripts/bench_load.py
+"""
+Closed-loop HTTP load generator for a running API.
+
+Opens `-c` concurrent connections that each hammer one route for `-d`
+seconds and prints throughput and latency percentiles, e.g. to compare the
+API under increasing connection counts:
+
+    cd backend && pip install httpx
+    python -m scripts.bench_load --url http://127.0.0.1:8000 --token $TOKEN -c 200 -d 30
+    python -m scripts.bench_load --path /journals/ --method POST --body '{"content": "hi"}' ...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, args, deadline: float, latencies: list, errors: list):
+    body = json.loads(args.body) if args.body else None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(args.method, args.path, json=body)
+            if resp.status_code >= 400:
+                errors.append(resp.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+def _pct(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] * 1000 if len(values) > 1 else 0.0
+
+
+async def run(args) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    latencies: list = []
+    errors: list = []
+    async with httpx.AsyncClient(
+        base_url=args.url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            _worker(client, args, deadline, latencies, errors) for _ in range(args.concurrency)
+        ))
+
+    total = len(latencies)
+    print(f"{args.method} {args.path}  concurrency={args.concurrency}  duration={args.duration}s")
+    print(f"requests={total}  rps={total / args.duration:.1f}  errors={len(errors)}")
+    print(
+        f"latency ms: p50={_pct(latencies, 50):.1f}  p95={_pct(latencies, 95):.1f}  "
+        f"p99={_pct(latencies, 99):.1f}  max={max(latencies, default=0) * 1000:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="journal API load benchmark")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", help="bearer token for authenticated routes")
+    parser.add_argument("--path", default="/journals/")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="JSON body for POST/PUT")
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/scripts/bench_password_pool.py
+"""
+Does a login burst slow down everything else?
+
+Runs a steady stream of "reads" while a burst of logins verifies bcrypt
+hashes, once with bcrypt on the shared request threadpool (the old
+`run_in_threadpool(verify_password, ...)`) and once on the dedicated
+password pool. A read is what a journal request costs besides the
+database: a hop through the shared threadpool (like the dependency and
+analysis calls) plus JSON encoding on the event loop. Reports read latency
+percentiles and login throughput. No database needed.
+
+    cd backend && python -m scripts.bench_password_pool --logins 200 --rounds 12
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.auth import passwords
+from app.core.ratelimit import RateLimited
+
+PAYLOAD = {
+    "entries": [
+        {"id": i, "content": "Went for a walk, felt calmer afterwards. " * 8, "mood": "positive"}
+        for i in range(200)
+    ]
+}
+
+
+def _threadpool_work() -> int:
+    return len(orjson.dumps(PAYLOAD))
+
+
+async def _read() -> float:
+    t0 = time.perf_counter()
+    await run_in_threadpool(_threadpool_work)
+    orjson.dumps(PAYLOAD)
+    return time.perf_counter() - t0
+
+
+async def _reads(stop: asyncio.Event, rate: float, out: list) -> None:
+    pending = []
+    while not stop.is_set():
+        pending.append(asyncio.create_task(_read()))
+        await asyncio.sleep(1 / rate)
+    out.extend(await asyncio.gather(*pending))
+
+
+async def _scenario(mode: str, ctx: CryptContext, stored: str, logins: int, read_rate: float):
+    async def login() -> bool:
+        try:
+            if mode == "shared":
+                await run_in_threadpool(ctx.verify, "correct horse", stored)
+            else:
+                await passwords.verify_and_update("correct horse", stored)
+            return True
+        except RateLimited:
+            return False
+
+    latencies: list = []
+    stop = asyncio.Event()
+    reader = asyncio.create_task(_reads(stop, read_rate, latencies))
+    await asyncio.sleep(0.5)  # baseline before the burst
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await reader
+
+    ms = sorted(x * 1000 for x in latencies)
+    q = statistics.quantiles(ms, n=100)
+    ok = sum(results)
+    print(
+        f"{mode:<9} reads {len(ms):5d}  p50 {q[49]:7.2f} ms  p95 {q[94]:7.2f} ms  "
+        f"p99 {q[98]:7.2f} ms  max {ms[-1]:7.1f} ms | logins ok {ok}/{logins} "
+        f"in {elapsed:5.2f} s ({ok / elapsed:5.1f}/s, {logins - ok} got 429)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200, help="concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--read-rate", type=float, default=200, help="reads started per second")
+    args = parser.parse_args()
+
+    ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    stored = ctx.hash("correct horse")
+    passwords.pwd_context = ctx
+    print(
+        f"bcrypt cost {args.rounds}, {args.logins} concurrent logins, "
+        f"dedicated pool: {passwords.password_gate.limit} threads, "
+        f"queue {passwords.password_gate.max_queue}"
+    )
+    for mode in ("shared", "dedicated"):
+        await _scenario(mode, ctx, stored, args.logins, args.read_rate)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
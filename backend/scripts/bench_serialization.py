@@ -0,0 +1,108 @@
+# backend/scripts/bench_serialization.py
+"""
+Time JSON serialization of a large GET /journals/ response.
+
+Builds N in-memory entries (with mood analysis, no database needed) and
+compares the ways a list response can be encoded:
+
+- jsonable_encoder + json.dumps   no response_model, default JSONResponse (before)
+- jsonable_encoder + orjson       no response_model, ORJSONResponse class
+- response_model TypeAdapter      validate + dump_json in pydantic-core (other routes)
+- typed models + model_dump_json  building JournalOut instances per row
+- orjson on the dicts             GET /journals/ (body is then cached as bytes)
+
+    cd backend && python -m scripts.bench_serialization -n 10000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.db import models
+from app.routers.journal import _serialize_entry
+from app.schemas.journal_schemas import JournalListOut, JournalOut
+
+try:
+    import orjson
+except ImportError:  # optional, only for the comparison
+    orjson = None
+
+
+def _make_entries(n: int) -> list:
+    start = datetime(2024, 1, 1)
+    entries = []
+    for i in range(n):
+        created = start + timedelta(minutes=i)
+        entry = models.JournalEntry(
+            id=uuid.uuid4(),
+            content=f"Entry {i}: " + "today was a long but good day. " * 12,
+            created_at=created,
+            updated_at=None,
+        )
+        entry.mood_analysis = models.MoodAnalysis(
+            id=uuid.uuid4(),
+            sentiment="positive",
+            emotion="joy",
+            score=0.93,
+            created_at=created,
+        )
+        entries.append(entry)
+    return entries
+
+
+def _json_dumps(content) -> bytes:
+    # what starlette's JSONResponse.render does
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _timeit(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings), len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=10000, help="entries per response")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    entries = _make_entries(args.n)
+    adapter = TypeAdapter(JournalListOut)
+
+    def dicts():
+        return {"entries": [_serialize_entry(e) for e in entries]}
+
+    cases = {
+        "jsonable_encoder + json.dumps": lambda: _json_dumps(jsonable_encoder(dicts())),
+        "response_model TypeAdapter": lambda: adapter.dump_json(adapter.validate_python(dicts())),
+        "typed models + model_dump_json": lambda: JournalListOut(
+            entries=[JournalOut(**_serialize_entry(e)) for e in entries]
+        ).model_dump_json().encode(),
+    }
+    if orjson is not None:
+        cases["jsonable_encoder + orjson"] = lambda: orjson.dumps(jsonable_encoder(dicts()))
+        cases["orjson on the dicts"] = lambda: orjson.dumps(dicts())
+
+    print(f"{args.n} entries, median of {args.repeat} runs")
+    for name, fn in cases.items():
+        median, size = _timeit(fn, args.repeat)
+        print(f"{name:<34} {median * 1000:8.1f} ms  {size / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
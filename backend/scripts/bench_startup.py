@@ -0,0 +1,107 @@
+# backend/scripts/bench_startup.py
+"""
+How long does a cold worker take to come up?
+
+Each run starts a fresh interpreter (no warm module cache, like a new
+container or worker) that imports app.main and then enters the app's
+lifespan, the same startup uvicorn performs before accepting requests.
+Reports median / p90 / max for both phases and, from one extra run under
+`python -X importtime`, the modules with the largest cumulative import time.
+
+Startup needs the database from .env; pass --import-only without one.
+`--json` prints a single line suitable for tracking across commits.
+
+    cd backend && python -m scripts.bench_startup --runs 10
+    cd backend && python -m scripts.bench_startup --import-only --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+out = {"import_ms": (t1 - t0) * 1000}
+if sys.argv[1] == "1":
+    async def startup():
+        from app.main import app
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+        return ready
+    ready = asyncio.run(startup())
+    out["startup_ms"] = (ready - t1) * 1000
+print(json.dumps(out))
+"""
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(startup: bool) -> dict:
+    env = {**os.environ, "SCHEDULER_ENABLED": "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, "1" if startup else "0"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _top_imports(n: int) -> list:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # only modules imported by the app itself or at the first level below it
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def _summary(values: list) -> dict:
+    ordered = sorted(values)
+    return {
+        "median": round(statistics.median(ordered), 1),
+        "p90": round(ordered[max(0, int(len(ordered) * 0.9) - 1)], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--import-only", action="store_true", help="skip the lifespan (no database needed)")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [_run(not args.import_only) for _ in range(args.runs)]
+    report = {"runs": args.runs, "import_ms": _summary([r["import_ms"] for r in results])}
+    if not args.import_only:
+        report["startup_ms"] = _summary([r["startup_ms"] for r in results])
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    for phase in ("import_ms", "startup_ms"):
+        if phase in report:
+            s = report[phase]
+            print(f"{phase:<11} median {s['median']:>7.1f}  p90 {s['p90']:>7.1f}  max {s['max']:>7.1f}")
+    print("\nslowest imports (cumulative ms, one run):")
+    for ms, name in _top_imports(args.top):
+        print(f"  {ms:>7.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
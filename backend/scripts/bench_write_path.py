@@ -0,0 +1,106 @@
+# backend/scripts/bench_write_path.py
+"""
+Count database round-trips and time per journal write.
+
+Creates a throwaway user in DATABASE_URL, calls the create and update
+routes N times with mood analysis replaced by a constant (so only the DB
+path is measured), prints statements/commits/latency per call, then
+deletes the user again.
+
+    cd backend && python -m scripts.bench_write_path -n 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, event
+
+from app.db import models
+from app.db.database import SessionLocal, engine
+from app.routers import journal
+from app.services import nlp
+
+FAKE_ANALYSIS = {"sentiment": "positive", "emotion": "joy", "score": 0.9}
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+def _report(name: str, n: int, counter: RoundTripCounter, timings: list) -> None:
+    print(
+        f"{name:<7} statements/call={counter.statements / n:.2f} "
+        f"commits/call={counter.commits / n:.2f} "
+        f"p50={statistics.median(timings) * 1000:.2f}ms "
+        f"max={max(timings) * 1000:.2f}ms"
+    )
+
+
+async def run(n: int) -> None:
+    nlp.analyze_mood = lambda text: dict(FAKE_ANALYSIS)
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    user = models.User(
+        username=f"bench_{tag}", email=f"bench_{tag}@example.com", hashed_password="x"
+    )
+    db.add(user)
+    await db.commit()
+
+    counter = RoundTripCounter()
+    try:
+        ids, timings = [], []
+        counter.reset()
+        for i in range(n):
+            start = time.perf_counter()
+            out = await journal.create_journal_entry(
+                journal.JournalEntryCreate(content=f"bench entry {i}"), db=db, current_user=user
+            )
+            timings.append(time.perf_counter() - start)
+            ids.append(out["entry"]["id"])
+        _report("create", n, counter, timings)
+
+        timings = []
+        counter.reset()
+        for entry_id in ids:
+            start = time.perf_counter()
+            await journal.update_entry(
+                entry_id, journal.JournalEntryUpdate(content="edited"), db=db, current_user=user
+            )
+            timings.append(time.perf_counter() - start)
+        _report("update", n, counter, timings)
+    finally:
+        await db.rollback()
+        for model in (models.MoodAnalysis, models.JournalEntry, models.JournalTombstone):
+            await db.execute(delete(model).where(model.user_id == user.id))
+        await db.execute(delete(models.User).where(models.User.id == user.id))
+        await db.commit()
+        await db.close()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="journal write-path round-trip benchmark")
+    parser.add_argument("-n", type=int, default=100, help="writes per operation")
+    args = parser.parse_args()
+    asyncio.run(run(args.n))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# backend/scripts/check_query_plans.py
+"""
+Query-plan regression check for the hot journal queries.
+
+Seeds a local Postgres (DATABASE_URL, already set up with `python -m
+scripts.init_db`) inside a transaction, runs EXPLAIN on each hot query and exits with
+status 1 if any of them falls back to a sequential scan on a journal table
+(or one of its monthly partitions), or if a time-bounded query touches more
+partitions than it should. Everything, including the partitions created for
+the seed data, is rolled back at the end, so it is safe to point at a dev DB.
+
+    cd backend && python -m scripts.check_query_plans
+
+CI runs it against a fresh Postgres on every backend change
+(.github/workflows/query-plans.yml), so a regressed plan fails the build.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.services.partitions import PARTITIONED_TABLES, add_months, create_partition_sql, month_start
+
+WATCHED_TABLES = {"journal_entries", "mood_analysis", "journal_tombstones"}
+# partitions this small are cheaper to seq scan; the planner is right to
+MIN_WATCHED_ROWS = 1000
+SEED_DAYS = 100  # seeded entries are spread over this many days
+
+# name -> SQL; :uid / :eid / :ecat are bound to a seeded user and one of their entries
+HOT_QUERIES = {
+    "list_entries": """
+        SELECT * FROM journal_entries
+        WHERE user_id = :uid ORDER BY created_at DESC
+    """,
+    "mood_by_entry": """
+        SELECT id, sentiment, emotion, score, created_at FROM mood_analysis
+        WHERE entry_id = :eid AND entry_created_at = :ecat
+    """,
+    "entry_by_id": """
+        SELECT * FROM journal_entries WHERE id = :eid AND user_id = :uid
+    """,
+    "export_join": """
+        SELECT e.id, e.content, e.created_at, m.sentiment, m.emotion, m.score
+        FROM journal_entries e
+        LEFT JOIN mood_analysis m ON m.entry_id = e.id AND m.entry_created_at = e.created_at
+        WHERE e.user_id = :uid ORDER BY e.created_at
+    """,
+    "list_entries_last_30_days": """
+        SELECT * FROM journal_entries
+        WHERE user_id = :uid AND created_at >= now() - interval '30 days' AND created_at < now()
+        ORDER BY created_at DESC
+    """,
+    "changes_entries": """
+        SELECT * FROM journal_entries
+        WHERE user_id = :uid AND change_seq > 0 ORDER BY change_seq LIMIT 500
+    """,
+    "pending_analysis": """
+        SELECT e.user_id, e.id FROM journal_entries e
+        LEFT JOIN mood_analysis m ON m.entry_id = e.id AND m.entry_created_at = e.created_at
+        WHERE m.id IS NULL
+          AND e.inserted_at >= now() - interval '30 days' AND e.inserted_at < now() - interval '10 minutes'
+        LIMIT 500
+    """,
+    "changes_tombstones": """
+        SELECT * FROM journal_tombstones
+        WHERE user_id = :uid AND change_seq > 0 ORDER BY change_seq LIMIT 500
+    """,
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, username, email, hashed_password, created_at, is_verified)
+    SELECT gen_random_uuid(), 'plancheck_' || g, 'plancheck_' || g || '@example.com',
+           'x', now(), true
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO journal_entries (id, user_id, content, created_at)
+    SELECT gen_random_uuid(), u.id, repeat('lorem ipsum ', 40),
+           now() - (g * :days / :entries || ' days')::interval
+    FROM users u CROSS JOIN generate_series(1, :entries) g
+    WHERE u.username LIKE 'plancheck\\_%'
+    """,
+    """
+    INSERT INTO mood_analysis
+        (id, user_id, entry_id, entry_created_at, sentiment, emotion, score, created_at)
+    SELECT gen_random_uuid(), e.user_id, e.id, e.created_at, 'positive', 'joy', 0.9, e.created_at
+    FROM journal_entries e JOIN users u ON u.id = e.user_id
+    WHERE u.username LIKE 'plancheck\\_%'
+    """,
+    """
+    INSERT INTO journal_tombstones (entry_id, user_id, deleted_at)
+    SELECT gen_random_uuid(), u.id, now()
+    FROM users u CROSS JOIN generate_series(1, 20) g
+    WHERE u.username LIKE 'plancheck\\_%'
+    """,
+]
+
+
+# queries without a created_at bound scan every partition; this caps how many
+# the maintained window (PARTITION_MONTHS_BACK + current + PARTITION_MONTHS_AHEAD) may hold
+UNPRUNED_PARTITION_BUDGET = 20
+
+# name -> most journal_entries partitions the plan may touch (partition pruning)
+MAX_PARTITIONS = {
+    "list_entries_last_30_days": 2,
+    "entry_by_id": UNPRUNED_PARTITION_BUDGET,
+    "changes_entries": UNPRUNED_PARTITION_BUDGET,
+}
+
+
+def _parent_table(relation: str) -> str:
+    """Map a monthly partition (journal_entries_p2026_01) to its parent."""
+    base, sep, _ = relation.rpartition("_p")
+    return base if sep and base in PARTITIONED_TABLES else relation
+
+
+def _relations(plan: dict, node_type: str = None) -> list:
+    """Return the relations scanned in `plan`, optionally only by `node_type`."""
+    found = []
+    if "Relation Name" in plan and node_type in (None, plan.get("Node Type")):
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_relations(child, node_type))
+    return found
+
+
+def _seed_partitions(conn, days: int) -> None:
+    """The seed data's months plus the window maintain_partitions keeps in production."""
+    first = month_start(datetime.utcnow())
+    months = {add_months(first, -n) for n in range(days // 28 + 2)}
+    months.update(
+        add_months(first, n)
+        for n in range(-settings.PARTITION_MONTHS_BACK, settings.PARTITION_MONTHS_AHEAD + 1)
+    )
+    for month in months:
+        for table in PARTITIONED_TABLES:
+            conn.execute(text(create_partition_sql(table, month)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=100, help="entries per user")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL)
+    failures = 0
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            _seed_partitions(conn, SEED_DAYS)
+            params = {"users": args.users, "entries": args.entries, "days": SEED_DAYS}
+            for sql in SEED_SQL:
+                conn.execute(text(sql), params)
+            conn.execute(text("ANALYZE users, journal_entries, mood_analysis, journal_tombstones"))
+            row_counts = dict(conn.execute(text(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"
+            )).all())
+
+            uid, eid, ecat = conn.execute(text(
+                "SELECT e.user_id, e.id, e.created_at FROM journal_entries e "
+                "JOIN users u ON u.id = e.user_id "
+                "WHERE u.username LIKE 'plancheck\\_%' LIMIT 1"
+            )).one()
+
+            for name, sql in HOT_QUERIES.items():
+                raw = conn.execute(
+                    text("EXPLAIN (FORMAT JSON) " + sql), {"uid": uid, "eid": eid, "ecat": ecat}
+                ).scalar()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                problems = []
+                scans = sorted({
+                    rel for rel in _relations(plan, "Seq Scan")
+                    if _parent_table(rel) in WATCHED_TABLES
+                    and row_counts.get(rel, 0) >= MIN_WATCHED_ROWS
+                })
+                if scans:
+                    problems.append(f"seq scan on {', '.join(scans)}")
+                if name in MAX_PARTITIONS:
+                    touched = {
+                        rel for rel in _relations(plan)
+                        if _parent_table(rel) == "journal_entries"
+                    }
+                    if len(touched) > MAX_PARTITIONS[name]:
+                        problems.append(
+                            f"touches {len(touched)} journal_entries partitions "
+                            f"(max {MAX_PARTITIONS[name]})"
+                        )
+                status = "FAIL" if problems else "ok"
+                print(f"[{status}] {name}" + (f": {'; '.join(problems)}" if problems else ""))
+                if args.verbose or problems:
+                    print(json.dumps(plan, indent=2))
+                failures += bool(problems)
+        finally:
+            trans.rollback()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# backend/scripts/init_db.py
+"""
+Bring the database schema to the current revision; run once per deploy,
+before the workers start (the app itself never runs DDL).
+
+- Empty database: the early revisions (before 7f164ed23efd) describe a
+  schema that was partly built by `Base.metadata.create_all` at app startup,
+  so replaying them from scratch does not work. Instead, create the current
+  schema from the models, the partitions the scheduler would create, and
+  `alembic stamp head`.
+- Database already under Alembic: `alembic upgrade head`.
+- Tables but no alembic_version: refuse, the revision has to be stamped by
+  hand (`alembic stamp <revision>`) before upgrading.
+
+    cd backend && python -m scripts.init_db
+"""
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.config import settings
+from app.db import models  # noqa: F401  (registers the tables on Base)
+from app.db.database import Base
+from app.services.partitions import PARTITIONED_TABLES, add_months, create_partition_sql, month_start
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _create_schema(conn) -> None:
+    Base.metadata.create_all(conn)
+    current = month_start(datetime.utcnow())
+    for n in range(settings.PARTITION_MONTHS_AHEAD + 1):
+        for table in PARTITIONED_TABLES:
+            conn.execute(text(create_partition_sql(table, add_months(current, n))))
+
+
+def main() -> None:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        fresh = not tables
+        if fresh:
+            _create_schema(conn)
+    engine.dispose()
+
+    if fresh:
+        command.stamp(config, "head")
+        print("created schema from the models, stamped head")
+    elif "alembic_version" in tables:
+        command.upgrade(config, "head")
+    else:
+        sys.exit("tables exist but alembic_version does not; run `alembic stamp <revision>` first")
+
+
+if __name__ == "__main__":
+    main()
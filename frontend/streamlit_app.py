@@ -85,6 +85,10 @@ def clear_remembered_user():
 def initialize_session_state():
     if "token" not in st.session_state:
         st.session_state["token"] = None
+    if "refresh_token" not in st.session_state:
+        st.session_state["refresh_token"] = None
+    if "remember" not in st.session_state:
+        st.session_state["remember"] = False
     if "username" not in st.session_state:
         st.session_state["username"] = None
     if "page" not in st.session_state:
@@ -95,17 +99,23 @@ def initialize_session_state():
     if not st.session_state.get("token"):
         remembered = load_remembered_user()
         if remembered:
-            token = load_token_for_user(remembered)
-            if token:
+            # only the refresh token is kept on disk; trade it for an access token
+            refresh_token = load_token_for_user(remembered)
+            if refresh_token:
                 st.session_state["username"] = remembered
-                st.session_state["token"] = token
+                st.session_state["refresh_token"] = refresh_token
+                st.session_state["remember"] = True
+                refresh_access_token()
 
 # --- Token Management ---
-def save_token(token: str, username: str = None, remember: bool = False):
+def save_token(token: str, username: str = None, remember: bool = False, refresh_token: str = None):
     if token:
         st.session_state["token"] = token
+    if refresh_token:
+        st.session_state["refresh_token"] = refresh_token
+    st.session_state["remember"] = remember
     if remember and username:
-        save_token_for_user(username, token)
+        save_token_for_user(username, refresh_token)
         remember_user(username)
 
 def load_token():
@@ -114,6 +124,7 @@ def load_token():
 def clear_token():
     cur_user = st.session_state.get("username")
     st.session_state["token"] = None
+    st.session_state["refresh_token"] = None
     clear_remembered_user()
     if cur_user:
         clear_token_for_user(cur_user)
@@ -121,7 +132,11 @@ def clear_token():
 # --- API Helper Functions ---
 def auth_headers():
     token = st.session_state.get("token")
-    return {"Authorization": f"Bearer {token}"} if token else {}
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    # read-your-writes: lets the API route our reads to a replica that has our last write
+    if st.session_state.get("write_lsn"):
+        headers["X-Write-LSN"] = st.session_state["write_lsn"]
+    return headers
 
 def post_register(username, email, password):
     url = f"{API_BASE}/users/register"
@@ -135,21 +150,63 @@ def post_login(email, password):
     url = f"{API_BASE}/users/login"
     return requests.post(url, json={"email": email, "password": password})
 
+def post_logout():
+    url = f"{API_BASE}/users/logout"
+    try:
+        requests.post(url, json={"refresh_token": st.session_state.get("refresh_token")}, headers=auth_headers())
+    except requests.exceptions.RequestException:
+        pass  # the local session is cleared either way
+
+def refresh_access_token() -> bool:
+    """Swap the refresh token for a new token pair; False if the session is over."""
+    refresh_token = st.session_state.get("refresh_token")
+    if not refresh_token:
+        return False
+    try:
+        r = requests.post(f"{API_BASE}/users/refresh", json={"refresh_token": refresh_token})
+    except requests.exceptions.RequestException:
+        return False
+    if r.status_code != 200:
+        clear_token()
+        return False
+    data = r.json()
+    save_token(
+        data.get("access_token"),
+        username=st.session_state.get("username"),
+        remember=st.session_state.get("remember", False),
+        refresh_token=data.get("refresh_token"),
+    )
+    return True
+
+def authed_request(method, url, **kwargs):
+    """Call the API with the access token, refreshing it once if it has expired."""
+    r = requests.request(method, url, headers=auth_headers(), **kwargs)
+    if r.status_code == 401 and refresh_access_token():
+        r = requests.request(method, url, headers=auth_headers(), **kwargs)
+    if r.headers.get("X-Write-LSN"):
+        st.session_state["write_lsn"] = r.headers["X-Write-LSN"]
+    return r
+
 def create_entry(text):
     url = f"{API_BASE}/journals/"
-    return requests.post(url, json={"content": text}, headers=auth_headers())
+    return authed_request("POST", url, json={"content": text})
 
 def list_entries():
     url = f"{API_BASE}/journals/"
-    return requests.get(url, headers=auth_headers())
+    return authed_request("GET", url)
 
 def delete_entry(entry_id):
     url = f"{API_BASE}/journals/{entry_id}"
-    return requests.delete(url, headers=auth_headers())
+    return authed_request("DELETE", url)
 
 def edit_entry(entry_id, new_content):
     url = f"{API_BASE}/journals/{entry_id}"
-    return requests.put(url, json={"content": new_content}, headers=auth_headers())
+    return authed_request("PUT", url, json={"content": new_content})
+
+def batch_entries(delete_ids=None, updates=None):
+    # one request for many deletes/edits; results come back per id
+    url = f"{API_BASE}/journals/batch"
+    return authed_request("POST", url, json={"delete": delete_ids or [], "update": updates or []})
 
 # --- UI ---
 def render_sidebar():
@@ -164,6 +221,7 @@ def render_sidebar():
                 st.session_state.page = "dashboard"
                 safe_rerun()
             if st.button("Logout", key="sidebar-logout"):
+                post_logout()
                 clear_token()
                 st.session_state.username = None
                 st.session_state.page = "home"
@@ -294,10 +352,11 @@ def render_login_page():
         if submitted:
             r = post_login(email, password)
             if r.status_code == 200:
-                token = r.json().get("access_token")
+                data = r.json()
+                token = data.get("access_token")
                 st.session_state.token = token
                 st.session_state.username = email
-                save_token(token, username=email, remember=remember_me)
+                save_token(token, username=email, remember=remember_me, refresh_token=data.get("refresh_token"))
                 st.session_state.page = "journal"
                 safe_rerun()
             else:
@@ -446,7 +505,9 @@ def render_journal_page():
                                 del st.session_state[f"edit_mode_{e_id}"]
                             safe_rerun()
                 else:
-                    col1, col2 = st.columns([1, 1])
+                    col1, col2, col3 = st.columns([1, 1, 1])
+                    with col3:
+                        st.checkbox("Select", key=f"select-{e_id}")
                     with col1:
                         if st.button("Edit", key=f"edit-{e_id}"):
                             st.session_state[f"edit_mode_{e_id}"] = True
@@ -466,6 +527,24 @@ def render_journal_page():
 
                 st.markdown("---")
 
+    # Delete every checked entry with a single batch request
+    selected = [e["id"] for e in processed if e.get("id") and st.session_state.get(f"select-{e['id']}")]
+    if selected and st.button(f"Delete selected ({len(selected)})", key="delete-selected-btn"):
+        br = batch_entries(delete_ids=selected)
+        if br.status_code == 200:
+            result = br.json()
+            st.success(f"Deleted {result.get('deleted', 0)} entries.")
+            if result.get("failed"):
+                st.warning(f"{result['failed']} entries could not be deleted.")
+            for entry_id in selected:
+                st.session_state.pop(f"select-{entry_id}", None)
+        else:
+            try:
+                st.error(br.json().get("detail", "Delete failed."))
+            except Exception:
+                st.error("Delete failed.")
+        safe_rerun()
+
 
 
 